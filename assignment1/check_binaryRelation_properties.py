@@ -1,12 +1,15 @@
-import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-from itertools import combinations, combinations_with_replacement
 import string
-from collections import defaultdict, deque
+import csv
+import glob
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 import sys
 
+# pandas (excel files), networkx and matplotlib (drawings) are imported when needed,
+# so that checking relations in batch doesn't load them
+
 def reading_excel(input):
     """
     read matrix form of binary relation which is in excel
@@ -17,52 +20,365 @@ def reading_excel(input):
     matrix_np - the matrix form of the binary relation as numpy array
     nodes - alphabetical labels of the nodes"""
 
+    import pandas as pd
+
     df = pd.read_excel(input, header=None)
     matrix_np = df.to_numpy()
 
-    # getting node labels as letters
-    nodes = list(string.ascii_lowercase)[:len(matrix_np)]
+    # getting node labels as letters: a, ..., z, aa, ab, ...
+    nodes = _default_labels(len(matrix_np))
+
+    return matrix_np, nodes
+
+
+def reading_edges(input, sep=None, header=False, nodes=None):
+    """
+    read a binary relation from an edge list, streamed line by line (no pandas)
+    input
+    - is a csv/tsv file with a line "x,y" for every pair of the relation xRy,
+    an optional third column keeps the pair only if it is 1, like in the matrix form
+    - sep is ',' or '\t' for a .tsv file if not given, header=True skips the first line
+
+    nodes - the labels in the order of the nodes, the labels found in the file and not in nodes
+    are added in the order they first appear
 
+    matrix_np - the relation as a PackedRelation
+    nodes - the labels of the nodes"""
+    if sep is None:
+        sep = '\t' if str(input).endswith('.tsv') else ','
+    nodes = list(nodes) if nodes is not None else []
+    index = {label: i for i, label in enumerate(nodes)}
+    rows, cols = array('q'), array('q')
+
+    with open(input, newline='') as f:
+        reader = csv.reader(f, delimiter=sep)
+        if header:
+            next(reader, None)
+        for line in reader:
+            if not line or line[0].startswith('#'):
+                continue
+            if len(line) > 2 and float(line[2]) != 1:
+                continue
+            for label, indices in ((line[0].strip(), rows), (line[1].strip(), cols)):
+                if label not in index:
+                    index[label] = len(nodes)
+                    nodes.append(label)
+                indices.append(index[label])
+
+    matrix_np = PackedRelation.from_edges(len(nodes), np.frombuffer(rows, dtype=np.int64),
+                                          np.frombuffer(cols, dtype=np.int64))
     return matrix_np, nodes
 
 
-def Visualizebinaryrelation(matrix_np,nodes):
+def reading_npz(input, nodes=None):
+    """
+    read a binary relation saved as a scipy sparse matrix (scipy.sparse.save_npz),
+    the non-zero entries equal to 1 are the pairs of the relation
+
+    nodes - the labels of the nodes, from a 'nodes' array saved in the same archive if there is one,
+    alphabetical otherwise
+
+    matrix_np - the relation as a PackedRelation
+    nodes - the labels of the nodes"""
+    from scipy import sparse
+
+    sparse_np = sparse.load_npz(input).tocoo()
+    if sparse_np.shape[0] != sparse_np.shape[1]:
+        raise ValueError(f"the matrix of a binary relation should be square, got {sparse_np.shape}")
+    n = sparse_np.shape[0]
+    pairs = sparse_np.data == 1
+    matrix_np = PackedRelation.from_edges(n, sparse_np.row[pairs], sparse_np.col[pairs])
+
+    if nodes is None:
+        with np.load(input, allow_pickle=False) as archive:
+            nodes = archive['nodes'].tolist() if 'nodes' in archive.files else _default_labels(n)
+    return matrix_np, list(nodes)
+
+
+def reading_npy(input, nodes=None, block_size=4096):
+    """
+    read the matrix form of a binary relation saved with numpy.save (booleans or 0/1),
+    the file is memory-mapped and packed block_size rows at a time,
+    so the matrix itself is never entirely in memory
+
+    matrix_np - the relation as a PackedRelation
+    nodes - the given labels of the nodes, alphabetical if not given"""
+    mapped = np.load(input, mmap_mode='r')
+    if mapped.ndim != 2 or mapped.shape[0] != mapped.shape[1]:
+        raise ValueError(f"the matrix of a binary relation should be square, got {mapped.shape}")
+    matrix_np = PackedRelation.from_matrix(mapped, block_size)
+    return matrix_np, list(nodes) if nodes is not None else _default_labels(len(mapped))
+
+
+def reading_relation(input, **kwargs):
+    """read a binary relation with the reader for the extension of the file:
+    .xlsx/.xls (matrix), .csv/.tsv/.txt (edge list), .npz (sparse matrix), .npy (matrix)"""
+    readers = {'.xlsx': reading_excel, '.xls': reading_excel, '.csv': reading_edges,
+               '.tsv': reading_edges, '.txt': reading_edges, '.npz': reading_npz, '.npy': reading_npy}
+    extension = os.path.splitext(str(input))[1].lower()
+    if extension not in readers:
+        raise ValueError(f"unknown format of {input}, expected one of {sorted(readers)}")
+    return readers[extension](input, **kwargs)
+
+
+def Visualizebinaryrelation(matrix_np, nodes, filename=None, hasse=False):
     """
     visualize the binary relation in a graphical form
+    filename - save the drawing to this file (.png, .svg, .pdf...) without any display,
+    show it in a window if None
+    hasse - draw the Hasse diagram instead of all the pairs: every cycle is merged into one node,
+    only the pairs not implied by transitivity are drawn and the nodes are drawn in layers
     """
+    import networkx as nx
+
     G = nx.DiGraph()
+    if hasse:
+        components, (sources, targets) = HasseDiagram(matrix_np)
+        labels = [', '.join(str(nodes[i]) for i in component) for component in components]
+        G.add_nodes_from(labels)
+        G.add_edges_from(zip([labels[i] for i in sources], [labels[i] for i in targets]))
+        # the first layer (nodes without predecessors) at the top
+        for layer, layer_nodes in enumerate(nx.topological_generations(G)):
+            for node in layer_nodes:
+                G.nodes[node]['layer'] = -layer
+        pos = nx.multipartite_layout(G, subset_key='layer', align='horizontal')
+    else:
+        # Adding nodes and all the edges of the relation at once
+        rows, cols = _edge_list(matrix_np)
+        G.add_nodes_from(nodes[:len(matrix_np)])
+        G.add_edges_from(zip([nodes[i] for i in rows], [nodes[j] for j in cols]))
+        pos = nx.spring_layout(G, seed=0)
 
-    # Adding nodes
-    for i in range(len(matrix_np)):
-        G.add_node(nodes[i])
-    
-    # Adding edges based on the binary relation matrix
-    for i in range(len(matrix_np)):
-        for j in range(len(matrix_np)):
-            if matrix_np[i][j] == 1:
-                G.add_edge(nodes[i], nodes[j])
-    
-    # Draw the graph of the relation
-    nx.draw(G, with_labels=True, arrows=True)
-    plt.show(block=True)
+    # Draw the graph of the relation, arrows are too slow for big graphs
+    large = len(G) > 100 or G.number_of_edges() > 1000
+    options = dict(with_labels=not large, arrows=not large, node_size=30 if large else 300)
+    if filename is None:
+        import matplotlib.pyplot as plt
+
+        nx.draw(G, pos, **options)
+        plt.show(block=True)
+        return
+
+    # no pyplot: the figure is rendered by the Agg canvas, no display needed
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    size = min(max(6.4, len(G) ** 0.5), 60)
+    figure = Figure(figsize=(size, size))
+    FigureCanvasAgg(figure)
+    nx.draw(G, pos, ax=figure.add_subplot(), **options)
+    figure.savefig(filename)
+
+
+def _pack_rows(rows, n_words):
+    """pack boolean rows into n_words 64-bit words per row, bit j of a row is pair j"""
+    packed = np.packbits(rows, axis=1, bitorder='little')
+    padded = np.zeros((len(rows), n_words * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view(np.uint64)
+
+
+def _bit_range_mask(lo, hi, n_words):
+    """(len(lo) x n_words) words with the bits from lo[i] (included) to hi[i] (excluded) set"""
+    starts = np.arange(n_words) * 64
+
+    def low_bits(k):
+        k = np.clip(k, 0, 64).astype(np.uint64)
+        return np.where(k >= 64, ~np.uint64(0), (np.uint64(1) << np.minimum(k, 63)) - np.uint64(1))
+
+    lo = np.asarray(lo)[:, None] - starts
+    hi = np.asarray(hi)[:, None] - starts
+    return low_bits(hi) & ~low_bits(lo)
+
+
+def _first_bit(words):
+    """index of the first set bit of a row of words"""
+    return int(np.unpackbits(words.view(np.uint8), bitorder='little').argmax())
+
+
+class PackedRelation:
+    """
+    binary relation stored as bits: every row of the matrix is packed into 64-bit words,
+    1 bit per pair instead of the 8 bytes of the matrix read from excel,
+    so a relation with 100k nodes takes 1.25GB.
+    The property checks work on it directly with AND/OR/XOR on whole words.
+
+    words - (n x n_words) uint64 array, bit j of row i is 1 if iRj
+    n - the number of nodes
+    """
+
+    def __init__(self, words, n):
+        self.words = words
+        self.n = n
+
+    @classmethod
+    def from_matrix(cls, matrix_np, block_size=4096):
+        """pack a matrix, the pairs with 1 are in the relation"""
+        n = len(matrix_np)
+        n_words = (n + 63) // 64
+        words = np.empty((n, n_words), dtype=np.uint64)
+        for i0 in range(0, n, block_size):
+            words[i0:i0 + block_size] = _pack_rows(np.asarray(matrix_np[i0:i0 + block_size]) == 1, n_words)
+        return cls(words, n)
+
+    @classmethod
+    def from_edges(cls, n, rows, cols):
+        """relation with n nodes and the pairs (rows[k], cols[k])"""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        words = np.zeros((n, (n + 63) // 64), dtype=np.uint64)
+        np.bitwise_or.at(words, (rows, cols // 64), np.uint64(1) << (cols % 64).astype(np.uint64))
+        return cls(words, n)
+
+    def __len__(self):
+        return self.n
+
+    def rows(self, i0, i1):
+        """rows i0:i1 of the relation as a boolean matrix"""
+        bits = np.unpackbits(self.words[i0:i1].view(np.uint8), axis=1, count=self.n, bitorder='little')
+        return bits.astype(bool)
+
+    def edges(self, i0=0, i1=None):
+        """the pairs (rows, cols) of rows i0:i1, row by row;
+        only the words with some bit set are unpacked"""
+        i1 = self.n if i1 is None else i1
+        word_rows, word_cols = np.nonzero(self.words[i0:i1])
+        bits = np.unpackbits(self.words[i0:i1][word_rows, word_cols].view(np.uint8).reshape(-1, 8),
+                             axis=1, bitorder='little')
+        pair, bit = np.nonzero(bits)
+        return word_rows[pair] + i0, word_cols[pair] * 64 + bit
+
+    def transposed_tile(self, i0, i1, j0, j1):
+        """pairs (j, i) for i in i0:i1 and j in j0:j1, i.e. a tile of the transposed relation,
+        packed like words. i0 and j0 should be multiples of 64"""
+        pairs = np.unpackbits(self.words[j0:j1].view(np.uint8)[:, i0 // 8:(i1 + 7) // 8], axis=1,
+                              count=i1 - i0, bitorder='little')
+        # the tile is small, so its transposition stays in the cache
+        return _pack_rows(np.ascontiguousarray(pairs.T), (j1 - j0 + 63) // 64)
+
+    def diagonal(self):
+        """boolean array, True for the nodes in relation with themselves"""
+        nodes = np.arange(self.n)
+        bits = self.words[nodes, nodes // 64] >> (nodes % 64).astype(np.uint64)
+        return (bits & np.uint64(1)).astype(bool)
+
+    def valid_mask(self):
+        """the bits of a row that are pairs, the rest is padding"""
+        return _bit_range_mask([0], [self.n], self.words.shape[1])[0]
+
+    def to_dense(self):
+        """the relation as a 0/1 matrix"""
+        return self.rows(0, self.n).astype(np.int8)
+
+
+def _as_matrix(matrix_np):
+    """numpy matrix of the relation, unpacking a PackedRelation"""
+    if isinstance(matrix_np, PackedRelation):
+        return matrix_np.to_dense()
+    return np.asarray(matrix_np)
+
+
+def _diagonal(matrix_np):
+    """boolean array, True for the nodes in relation with themselves"""
+    if isinstance(matrix_np, PackedRelation):
+        return matrix_np.diagonal()
+    return np.diagonal(np.asarray(matrix_np)) == 1
+
+
+def _first_pair(matrix_np, violation, block_size=1024):
+    """first pair (i, j), i < j, in the order of combinations(range(n), 2) for which
+    violation(iRj, jRi) is True, None if there is no such pair.
+    violation only uses ~, &, | and ^, so it works on whole tiles of booleans
+    of the matrix and its transpose, or on the 64-bit words of a PackedRelation"""
+    if isinstance(matrix_np, PackedRelation):
+        return _first_pair_packed(matrix_np, violation, block_size)
+
+    matrix_np = np.asarray(matrix_np)
+    n = len(matrix_np)
+    for i0 in range(0, n, block_size):
+        i1 = min(i0 + block_size, n)
+        first = None
+        for j0 in range(i0, n, block_size):
+            j1 = min(j0 + block_size, n)
+            mask = violation(matrix_np[i0:i1, j0:j1] == 1, matrix_np[j0:j1, i0:i1].T == 1)
+            if j0 == i0:
+                mask = np.triu(mask, 1)
+            if mask.any():
+                k = int(mask.argmax())
+                pair = (i0 + k // mask.shape[1], j0 + k % mask.shape[1])
+                first = pair if first is None else min(first, pair)
+        if first is not None:
+            return first
+    return None
+
+
+def _first_pair_packed(relation, violation, block_size):
+    """_first_pair on tiles of the words of the rows and of the transposed rows"""
+    n = relation.n
+    # the tiles start on word boundaries
+    block_size = max(64, block_size // 64 * 64)
+    for i0 in range(0, n, block_size):
+        i1 = min(i0 + block_size, n)
+        first = None
+        for j0 in range(i0, n, block_size):
+            j1 = min(j0 + block_size, n)
+            transposed = relation.transposed_tile(i0, i1, j0, j1)
+            words = relation.words[i0:i1, j0 // 64:j0 // 64 + transposed.shape[1]]
+            # only the pairs j > i, not the padding
+            upper = _bit_range_mask(np.arange(i0, i1) + 1 - j0, np.full(i1 - i0, j1 - j0), transposed.shape[1])
+            found = violation(words, transposed) & upper
+            rows = np.flatnonzero(found.any(axis=1))
+            if len(rows):
+                pair = (i0 + int(rows[0]), j0 + _first_bit(found[rows[0]]))
+                first = pair if first is None else min(first, pair)
+        if first is not None:
+            return first
+    return None
+
+
+def _node_without_loop(matrix_np):
+    """first node without an edge to itself, None if there is none"""
+    missing = np.flatnonzero(~_diagonal(matrix_np))
+    return int(missing[0]) if len(missing) else None
+
+
+def _node_with_loop(matrix_np):
+    """first node with an edge to itself, None if there is none"""
+    loops = np.flatnonzero(_diagonal(matrix_np))
+    return int(loops[0]) if len(loops) else None
+
+
+def _unrelated_pair(matrix_np):
+    """first pair of different nodes without any relation between them"""
+    return _first_pair(matrix_np, lambda ij, ji: ~ij & ~ji)
+
+
+def _two_way_pair(matrix_np):
+    """first pair of different nodes in relation both ways"""
+    return _first_pair(matrix_np, lambda ij, ji: ij & ji)
+
+
+def _one_way_pair(matrix_np):
+    """first pair of different nodes in relation only one way"""
+    return _first_pair(matrix_np, lambda ij, ji: ij ^ ji)
 
 
 def ReflexiveCheck(matrix_np,nodes):
     """check reflexivity - if all nodes have edges to themselves"""
-    for i in range(len(matrix_np)):
-        if matrix_np[i][i] == 0:
-            print(f"Reflexive? No. Node #{nodes[i]} has no edge to itself")
-            return False
+    node = _node_without_loop(matrix_np)
+    if node is not None:
+        print(f"Reflexive? No. Node #{nodes[node]} has no edge to itself")
+        return False
     print("Reflexive? Yes.")
     return True
 
 
 def CompleteCheck(matrix_np,nodes):
     """check completeness - if all pairs of nodes have at least one edge with each other"""
-    for (i,j) in combinations(range(len(matrix_np)), 2):
-        if matrix_np[i][j] == 0 and matrix_np[j][i] == 0:
-            print(f"Complete? No. No relation for nodes #{nodes[i]} and #{nodes[j]}")
-            return False
+    pair = _unrelated_pair(matrix_np)
+    if pair is not None:
+        i, j = pair
+        print(f"Complete? No. No relation for nodes #{nodes[i]} and #{nodes[j]}")
+        return False
         
     if ReflexiveCheck(matrix_np,nodes) == False:
         print(f"Complete? No. Reflexivity is not supported")
@@ -74,16 +390,17 @@ def CompleteCheck(matrix_np,nodes):
 
 def AsymmetricCheck(matrix_np,nodes):
     """check if asymmetric - each pair of nodes can have at most one relation with each other"""
-    for (i,j) in combinations(range(len(matrix_np)), 2):
-        if matrix_np[i][j] == 1 and matrix_np[j][i] == 1:
-            print(f"Asymmetric? No. Node combination {nodes[i]}, {nodes[j]} have both side relations")
-            return False
+    pair = _two_way_pair(matrix_np)
+    if pair is not None:
+        i, j = pair
+        print(f"Asymmetric? No. Node combination {nodes[i]}, {nodes[j]} have both side relations")
+        return False
     
     # check if nodes have relations to itself 
-    for i in range(len(matrix_np)):
-        if matrix_np[i][i] == 1:
-            print(f"Asymmetric? No. Node {nodes[i]} has a relation to itself")
-            return False
+    node = _node_with_loop(matrix_np)
+    if node is not None:
+        print(f"Asymmetric? No. Node {nodes[node]} has a relation to itself")
+        return False
     
     print("Asymmetric? Yes.")
     return True
@@ -91,57 +408,132 @@ def AsymmetricCheck(matrix_np,nodes):
 
 def SymmetricCheck(matrix_np,nodes):
     """check if symmetric - each pair of nodes have either 2 or 0 relations with each other"""
-    for (i,j) in combinations(range(len(matrix_np)), 2):
-        if not (
-            (matrix_np[i][j]==1 and matrix_np[j][i]==1) or 
-            (matrix_np[i][j]==0 and matrix_np[j][i]==0)
-        ):
-            print(f"Symmetric? No. Node combination {nodes[i]}, {nodes[j]} don't have both side relations")
-            return False
+    pair = _one_way_pair(matrix_np)
+    if pair is not None:
+        i, j = pair
+        print(f"Symmetric? No. Node combination {nodes[i]}, {nodes[j]} don't have both side relations")
+        return False
     print("Symmetric? Yes.")
     return True
 
 
 def AntisymmetricCheck(matrix_np,nodes):
     """check if antisymmetric"""
-    for (i,j) in combinations(range(len(matrix_np)), 2):
-        if (matrix_np[i][j]==1 and matrix_np[j][i]==1):
-            print(f"Antisymmetric? No. Node combination {nodes[i]}, {nodes[j]} have both side relations")
-            return False
+    pair = _two_way_pair(matrix_np)
+    if pair is not None:
+        i, j = pair
+        print(f"Antisymmetric? No. Node combination {nodes[i]}, {nodes[j]} have both side relations")
+        return False
     print("Antisymmetric? Yes.")
     return True
 
 
-def TransitiveCheck(matrix_np, nodes):
-    """check if transitive: xRy, yRz --> xRz"""
-    for x in range(len(matrix_np)):
-        for y in range(len(matrix_np)):
+def _bool_product_rows(a, b, i0, i1, block_size=None):
+    """rows i0:i1 of the boolean product of a and b: True where a[i][k] and b[k][j] for some k.
+    Computed as float32 matrix products of blocks of block_size columns of a (all at once if None),
+    so the memory used is bounded by the size of the blocks"""
+    n = a.shape[1]
+    block_size = block_size or n
+    product = np.zeros((i1 - i0, b.shape[1]), dtype=bool)
+    for k0 in range(0, n, block_size):
+        k1 = min(k0 + block_size, n)
+        a_block = a[i0:i1, k0:k1]
+        if not a_block.any():
+            continue
+        product |= (a_block.astype(np.float32) @ b[k0:k1].astype(np.float32)) > 0
+    return product
 
-            # checking the first condition
-            if matrix_np[x][y] == 1:
 
-                # checking the 2nd and 3rd conditions
-                for z in range(len(matrix_np)):
-                    if (matrix_np[y][z]==1 and matrix_np[x][z]==0):
-                        print(f"Transitive? No. Node combination {nodes[x]}, {nodes[y]}, {nodes[z]} doesn't satisfy the condition.")
-                        return False
-    print("Transitive? Yes.")
-    return True
+def _first_triple(edge, missing, block_size=None):
+    """first (x, y, z) in the order of the nested loops over x, y, z with
+    edge[x][y], edge[y][z] and missing[x][z], None if there is none.
+    The rows of edge @ edge are computed block_size at a time (all at once if None)"""
+    n = len(edge)
+    row_block = block_size or n
+    for x0 in range(0, n, row_block):
+        x1 = min(x0 + row_block, n)
+        violations = _bool_product_rows(edge, edge, x0, x1, block_size) & missing[x0:x1]
+        rows = np.flatnonzero(violations.any(axis=1))
+        if len(rows) == 0:
+            continue
+        x = x0 + rows[0]
+        # the first y leading to a z without a relation from x, then the first such z
+        ys = np.flatnonzero(edge[x])
+        candidates = edge[ys] & missing[x]
+        y = ys[candidates.any(axis=1).argmax()]
+        z = (edge[y] & missing[x]).argmax()
+        return int(x), int(y), int(z)
+    return None
+
+
+def _first_triple_packed(relation, complement=False):
+    """_first_triple on a PackedRelation: for each x, the rows of its successors y
+    are ANDed word by word with the pairs missing from the row of x.
+    complement - look at the complement of the relation (negative transitivity)"""
+    words, valid = relation.words, relation.valid_mask()
+    for x in range(relation.n):
+        edge_row = ~words[x] & valid if complement else words[x]
+        ys = np.flatnonzero(np.unpackbits(edge_row.view(np.uint8), count=relation.n, bitorder='little'))
+        if len(ys) == 0:
+            continue
+        successors = ~words[ys] & valid if complement else words[ys]
+        found = successors & (~edge_row & valid)
+        hits = found.any(axis=1)
+        if hits.any():
+            y_idx = int(hits.argmax())
+            return x, int(ys[y_idx]), _first_bit(found[y_idx])
+    return None
 
 
-def NegativetransitiveCheck(matrix_np, nodes):
-    """check if negatively transitive: not(xRy), not(yRz) --> not(xRz)"""
-    for x in range(len(matrix_np)):
-        for y in range(len(matrix_np)):
+def TransitiveClosure(matrix_np, block_size=None):
+    """the smallest transitive relation containing the relation, as a 0/1 matrix.
+    Computed by squaring the relation until it stops changing (log(n) boolean products),
+    block_size bounds the memory of the products (see _bool_product_rows)"""
+    closure = _as_matrix(matrix_np) == 1
+    n = len(closure)
+    row_block = block_size or n
+    while True:
+        squared = np.zeros_like(closure)
+        for i0 in range(0, n, row_block):
+            i1 = min(i0 + row_block, n)
+            squared[i0:i1] = _bool_product_rows(closure, closure, i0, i1, block_size)
+        if not (squared & ~closure).any():
+            return closure.astype(int)
+        closure |= squared
+
+
+def _transitivity_violation(matrix_np, block_size=None, complement=False):
+    """first (x, y, z) with xRy, yRz and not xRz, None if the relation is transitive.
+    complement - look at the complement of the relation (negative transitivity)"""
+    if isinstance(matrix_np, PackedRelation):
+        return _first_triple_packed(matrix_np, complement)
+    edge = np.asarray(matrix_np) == 1
+    if complement:
+        return _first_triple(~edge, edge, block_size)
+    return _first_triple(edge, ~edge, block_size)
+
+
+def TransitiveCheck(matrix_np, nodes, block_size=None):
+    """check if transitive: xRy, yRz --> xRz
+    block_size - number of rows of R @ R computed at a time, all of them if None"""
+    triple = _transitivity_violation(matrix_np, block_size)
+    if triple is not None:
+        x, y, z = triple
+        print(f"Transitive? No. Node combination {nodes[x]}, {nodes[y]}, {nodes[z]} doesn't satisfy the condition.")
+        return False
+    print("Transitive? Yes.")
+    return True
 
-            # checking the 1st condition
-            if matrix_np[x][y] == 0:
 
-                # checking the 2nd and 3rd conditions
-                for z in range(len(matrix_np)):
-                    if matrix_np[y][z] == 0 and matrix_np[x][z] == 1:
-                        print(f"NegativelyTransitive? No. Node combination {nodes[x]}, {nodes[y]}, {nodes[z]} doesn't satisfy the condition.")
-                        return False
+def NegativetransitiveCheck(matrix_np, nodes, block_size=None):
+    """check if negatively transitive: not(xRy), not(yRz) --> not(xRz)
+    i.e. the complement of the relation is transitive
+    block_size - number of rows of the products computed at a time, all of them if None"""
+    triple = _transitivity_violation(matrix_np, block_size, complement=True)
+    if triple is not None:
+        x, y, z = triple
+        print(f"NegativelyTransitive? No. Node combination {nodes[x]}, {nodes[y]}, {nodes[z]} doesn't satisfy the condition.")
+        return False
     print("NegativelyTransitive? Yes.")
     return True
 
@@ -170,98 +562,775 @@ def CompletePreOrderCheck(matrix_np, nodes):
     return False
 
 
-def StrictRelation(matrix_np):
-    """getting the asymmetric part of the relation: for a and b, aRb but NOT bRa"""
-    asymmetric_np =np.zeros((len(matrix_np),len(matrix_np)))
+def _successor_rows(matrix_np, index):
+    """rows of the relation: words of a PackedRelation, booleans of a matrix"""
+    if isinstance(matrix_np, PackedRelation):
+        return matrix_np.words[index]
+    return np.asarray(matrix_np)[index] == 1
 
-    for (i,j) in combinations_with_replacement(range(len(matrix_np)),2):
-        if matrix_np[i][j]==1 and matrix_np[j][i]==0:
-            asymmetric_np[i][j] = 1
 
-        elif matrix_np[i][j]==0 and matrix_np[j][i]==1:
-            asymmetric_np[j][i] = 1
+def _first_successor(row):
+    """first node of a row given by _successor_rows"""
+    if row.dtype == np.uint64:
+        return _first_bit(row)
+    return int(row.argmax())
 
-    return asymmetric_np
 
+def _ferrers_violation(matrix_np, block_size=4096):
+    """first (a, b, c, d) found with aRb, cRd, not aRd and not cRb, None if the relation is Ferrers.
+    The relation is Ferrers iff the sets of successors of the nodes are nested,
+    so only the rows next to each other in the order of their sizes are compared"""
+    n = len(matrix_np)
+    sizes = np.empty(n, dtype=np.int64)
+    for i0 in range(0, n, block_size):
+        rows = _successor_rows(matrix_np, slice(i0, i0 + block_size))
+        if rows.dtype == np.uint64:
+            rows = np.unpackbits(rows.view(np.uint8), axis=1, bitorder='little')
+        sizes[i0:i0 + block_size] = rows.sum(axis=1)
+    order = np.argsort(-sizes, kind='stable')
 
-def IndifferenceRelation(matrix_np):
-    """getting the symmetric part of the relation: for a and b, aRb AND bRa, includes aRa"""
-    symmetric_np = np.zeros((len(matrix_np),len(matrix_np)))
+    for k0 in range(0, n - 1, block_size):
+        index = order[k0:k0 + block_size + 1]
+        rows = _successor_rows(matrix_np, index)
+        # a successor of the smaller row that the bigger row doesn't have
+        not_nested = rows[1:] & ~rows[:-1]
+        failing = np.flatnonzero(not_nested.any(axis=1))
+        if len(failing):
+            k = failing[0]
+            a, c = int(index[k]), int(index[k + 1])
+            b = _first_successor(rows[k] & ~rows[k + 1])
+            d = _first_successor(not_nested[k])
+            return a, b, c, d
+    return None
 
-    for (i,j) in combinations_with_replacement(range(len(matrix_np)),2):
-        if matrix_np[i][j]==1 and matrix_np[j][i]==1:
-                symmetric_np[i][j] = 1
-                symmetric_np[j][i] = 1
 
-    return symmetric_np
+def _semitransitivity_violation(matrix_np, block_size=1024):
+    """first (a, b, c, d) with aRb, bRc, not aRd and not dRc, None if the relation is semitransitive"""
+    if isinstance(matrix_np, PackedRelation):
+        return _semitransitivity_violation_packed(matrix_np, block_size)
+    edge = np.asarray(matrix_np) == 1
+    missing = ~edge
+    n = len(edge)
+    row_block = block_size or n
+    for a0 in range(0, n, row_block):
+        a1 = min(a0 + row_block, n)
+        violations = (_bool_product_rows(edge, edge, a0, a1, block_size)
+                      & _bool_product_rows(missing, missing, a0, a1, block_size))
+        rows = np.flatnonzero(violations.any(axis=1))
+        if len(rows):
+            a = a0 + int(rows[0])
+            c = int(violations[rows[0]].argmax())
+            b = int((edge[a] & edge[:, c]).argmax())
+            d = int((missing[a] & missing[:, c]).argmax())
+            return a, b, c, d
+    return None
 
 
-def Topologicalsorting(matrix_np):
-    """Perform topological sorting
-    returns the order if you have no cycles, returns None if you have cycles"""
-    topological_order = [] # to store the final order
+def _reduce_rows(words, nodes, ufunc, initial, block_size=1024):
+    """ufunc (np.bitwise_or or np.bitwise_and) of the rows of the given nodes, block_size rows at a time"""
+    row = np.full(words.shape[1], initial, dtype=np.uint64)
+    step = block_size or max(len(nodes), 1)
+    for k0 in range(0, len(nodes), step):
+        row = ufunc(row, ufunc.reduce(words[nodes[k0:k0 + step]], axis=0))
+    return row
+
+
+def _semitransitivity_violation_packed(relation, block_size=1024):
+    """_semitransitivity_violation on a PackedRelation: for each a, the nodes c reached in two steps
+    (OR of the rows of the successors of a) and in two steps of the complement (the pairs missing
+    from the AND of the rows of the other nodes), without unpacking the relation"""
+    words, valid = relation.words, relation.valid_mask()
+    for a in range(relation.n):
+        successors = np.flatnonzero(np.unpackbits(words[a].view(np.uint8), count=relation.n, bitorder='little'))
+        two_steps = _reduce_rows(words, successors, np.bitwise_or, 0, block_size)
+        if not two_steps.any():
+            continue
+        others = np.flatnonzero(np.unpackbits((~words[a] & valid).view(np.uint8), count=relation.n,
+                                              bitorder='little'))
+        violations = two_steps & ~_reduce_rows(words, others, np.bitwise_and, ~np.uint64(0), block_size)
+        if violations.any():
+            c = _first_bit(violations)
+            word, bit = c // 64, np.uint64(1 << (c % 64))
+            b = successors[((words[successors, word] & bit) != 0).argmax()]
+            d = others[((words[others, word] & bit) == 0).argmax()]
+            return a, int(b), c, int(d)
+    return None
+
+
+def _default_labels(n):
+    """alphabetical labels of n nodes: a, ..., z, then aa, ab, ... like spreadsheet columns"""
+    labels = []
+    for i in range(n):
+        label = ''
+        i += 1
+        while i:
+            i, rest = divmod(i - 1, 26)
+            label = string.ascii_lowercase[rest] + label
+        labels.append(label)
+    return labels
+
+
+class RelationReport:
+    """
+    properties of a binary relation, each basic property is computed once, when first needed,
+    and the compound ones (total order, complete pre-order, interval order, semiorder)
+    are derived from them.
+
+    matrix_np - the relation, a matrix or a PackedRelation
+    nodes - the labels of the nodes, alphabetical if not given
+    block_size - number of rows of the matrix products computed at a time (all of them if None,
+        which takes several n x n float32 matrices)
+
+    report.holds('transitive') -> bool, report.witness('transitive') -> labels of the violating nodes,
+    report.results() -> dict of all of them, report.print_report() for the messages
+    """
+
+    BASIC = ('reflexive', 'complete', 'asymmetric', 'symmetric', 'antisymmetric',
+             'transitive', 'negatively_transitive', 'ferrers', 'semitransitive')
+    COMPOUND = ('total_order', 'complete_preorder', 'interval_order', 'semiorder')
+
+    def __init__(self, matrix_np, nodes=None, block_size=1024):
+        self.matrix_np = matrix_np if isinstance(matrix_np, PackedRelation) else np.asarray(matrix_np)
+        self.nodes = nodes if nodes is not None else _default_labels(len(matrix_np))
+        self.block_size = block_size
+        # name: (holds, witness, message)
+        self._results = {}
+
+    def _result(self, name):
+        if name not in self._results:
+            self._results[name] = getattr(self, f'_check_{name}')()
+        return self._results[name]
+
+    def holds(self, name):
+        """whether the relation has the property"""
+        return self._result(name)[0]
+
+    def witness(self, name):
+        """labels of the nodes violating the property, None if it holds"""
+        return self._result(name)[1]
+
+    def message(self, name):
+        """the message of the property, as printed by the check functions"""
+        return self._result(name)[2]
+
+    def results(self, names=None):
+        """{name: {'holds': bool, 'witness': labels or None}} for all (or the given) properties"""
+        names = names or self.BASIC + self.COMPOUND
+        return {name: {'holds': self.holds(name), 'witness': self.witness(name)} for name in names}
+
+    def print_report(self, names=None):
+        for name in names or self.BASIC + self.COMPOUND:
+            print(self.message(name))
+
+    def _labels(self, indexes):
+        return tuple(self.nodes[i] for i in indexes)
+
+    def _check_reflexive(self):
+        node = _node_without_loop(self.matrix_np)
+        if node is None:
+            return True, None, "Reflexive? Yes."
+        return False, self._labels([node]), f"Reflexive? No. Node #{self.nodes[node]} has no edge to itself"
+
+    def _check_complete(self):
+        pair = _unrelated_pair(self.matrix_np)
+        if pair is not None:
+            i, j = pair
+            return False, self._labels(pair), f"Complete? No. No relation for nodes #{self.nodes[i]} and #{self.nodes[j]}"
+        if not self.holds('reflexive'):
+            return False, self.witness('reflexive'), "Complete? No. Reflexivity is not supported"
+        return True, None, "Complete? Yes."
+
+    def _check_antisymmetric(self):
+        pair = _two_way_pair(self.matrix_np)
+        if pair is None:
+            return True, None, "Antisymmetric? Yes."
+        i, j = pair
+        return False, self._labels(pair), f"Antisymmetric? No. Node combination {self.nodes[i]}, {self.nodes[j]} have both side relations"
+
+    def _check_asymmetric(self):
+        # the pairs with both side relations are the ones breaking antisymmetry
+        if not self.holds('antisymmetric'):
+            i, j = self.witness('antisymmetric')
+            return False, (i, j), f"Asymmetric? No. Node combination {i}, {j} have both side relations"
+        node = _node_with_loop(self.matrix_np)
+        if node is not None:
+            return False, self._labels([node]), f"Asymmetric? No. Node {self.nodes[node]} has a relation to itself"
+        return True, None, "Asymmetric? Yes."
+
+    def _check_symmetric(self):
+        pair = _one_way_pair(self.matrix_np)
+        if pair is None:
+            return True, None, "Symmetric? Yes."
+        i, j = pair
+        return False, self._labels(pair), f"Symmetric? No. Node combination {self.nodes[i]}, {self.nodes[j]} don't have both side relations"
+
+    def _check_transitive(self):
+        triple = _transitivity_violation(self.matrix_np, self.block_size)
+        if triple is None:
+            return True, None, "Transitive? Yes."
+        return False, self._labels(triple), \
+            "Transitive? No. Node combination {}, {}, {} doesn't satisfy the condition.".format(*self._labels(triple))
+
+    def _check_negatively_transitive(self):
+        triple = _transitivity_violation(self.matrix_np, self.block_size, complement=True)
+        if triple is None:
+            return True, None, "NegativelyTransitive? Yes."
+        return False, self._labels(triple), \
+            "NegativelyTransitive? No. Node combination {}, {}, {} doesn't satisfy the condition.".format(*self._labels(triple))
+
+    def _check_ferrers(self):
+        violation = _ferrers_violation(self.matrix_np)
+        if violation is None:
+            return True, None, "Ferrers? Yes."
+        return False, self._labels(violation), \
+            "Ferrers? No. {}R{} and {}R{} but neither {}R{} nor {}R{}.".format(
+                *self._labels([violation[i] for i in (0, 1, 2, 3, 0, 3, 2, 1)]))
+
+    def _check_semitransitive(self):
+        violation = _semitransitivity_violation(self.matrix_np, self.block_size)
+        if violation is None:
+            return True, None, "Semitransitive? Yes."
+        return False, self._labels(violation), \
+            "Semitransitive? No. {}R{} and {}R{} but neither {}R{} nor {}R{}.".format(
+                *self._labels([violation[i] for i in (0, 1, 1, 2, 0, 3, 3, 2)]))
+
+    def _derived(self, title, requirements):
+        """compound property holding if all the requirements hold, checked in order"""
+        for name, reason in requirements:
+            if not self.holds(name):
+                return False, self.witness(name), f"{title}? No. It's not {reason}."
+        return True, None, f"{title}? Yes."
+
+    def _check_total_order(self):
+        return self._derived("TotalOrder", [
+            ('complete', 'complete'), ('antisymmetric', 'antisymmetric'), ('transitive', 'transitive')])
+
+    def _check_complete_preorder(self):
+        return self._derived("Complete Pre-order", [('complete', 'complete'), ('transitive', 'transitive')])
+
+    def _check_interval_order(self):
+        return self._derived("IntervalOrder", [('complete', 'complete'), ('ferrers', 'Ferrers')])
+
+    def _check_semiorder(self):
+        return self._derived("Semiorder", [
+            ('complete', 'complete'), ('ferrers', 'Ferrers'), ('semitransitive', 'semitransitive')])
+
+
+class IncrementalRelation:
+    """
+    binary relation changed one pair at a time (e.g. during preference elicitation), which keeps
+    the counts behind its properties up to date instead of checking everything again:
+    - missing_loops: nodes without an edge to themselves
+    - loops: nodes with an edge to themselves
+    - unrelated_pairs, one_way_pairs, two_way_pairs: pairs of different nodes with 0, 1 or 2 relations
+    - transitivity_violations: triples (x, y, z) with xRy, yRz and not xRz,
+    from paths[x][z], the number of y with xRy and yRz (R @ R)
+
+    adding or removing a pair updates the row and the column of paths it changes, O(n),
+    the verdicts are then read from the counts.
+
+    matrix_np - the starting relation (a matrix or a PackedRelation), or n for n nodes without relations
+    nodes - the labels of the nodes, alphabetical if not given
+
+    relation.add(i, j), relation.remove(i, j), relation.holds('transitive'),
+    relation.report() for the witnesses of the current relation
+    """
+
+    PROPERTIES = ('reflexive', 'complete', 'asymmetric', 'symmetric', 'antisymmetric',
+                  'transitive', 'total_order', 'complete_preorder')
+
+    def __init__(self, matrix_np, nodes=None, block_size=1024):
+        if isinstance(matrix_np, (int, np.integer)):
+            matrix_np = np.zeros((matrix_np, matrix_np), dtype=bool)
+        self.matrix_np = _as_matrix(matrix_np) == 1
+        n = len(self.matrix_np)
+        self.nodes = nodes if nodes is not None else _default_labels(n)
+
+        self.loops = int(np.count_nonzero(np.diagonal(self.matrix_np)))
+        self.missing_loops = n - self.loops
+        both = self.matrix_np & self.matrix_np.T
+        either = self.matrix_np | self.matrix_np.T
+        # the pairs of different nodes are counted once: half of the matrix without the diagonal
+        self.two_way_pairs = int((np.count_nonzero(both) - self.loops) // 2)
+        self.unrelated_pairs = int((n * n - np.count_nonzero(either) - self.missing_loops) // 2)
+        self.one_way_pairs = n * (n - 1) // 2 - self.two_way_pairs - self.unrelated_pairs
+
+        # exact in float32 as long as n < 2**24
+        edges = self.matrix_np.astype(np.float32)
+        self.paths = np.empty((n, n), dtype=np.int32)
+        for i0 in range(0, n, block_size):
+            self.paths[i0:i0 + block_size] = edges[i0:i0 + block_size] @ edges
+        self.transitivity_violations = int(self.paths[~self.matrix_np].sum(dtype=np.int64))
+
+    def __len__(self):
+        return len(self.matrix_np)
+
+    def __contains__(self, pair):
+        i, j = pair
+        return bool(self.matrix_np[i, j])
+
+    def add(self, i, j):
+        """add the pair iRj, returns False if it was already in the relation"""
+        return self._set(i, j, True)
+
+    def remove(self, i, j):
+        """remove the pair iRj, returns False if it was not in the relation"""
+        return self._set(i, j, False)
+
+    def _set(self, i, j, value):
+        R = self.matrix_np
+        if R[i, j] == value:
+            return False
+
+        if i == j:
+            change = 1 if value else -1
+            self.loops += change
+            self.missing_loops -= change
+        else:
+            before = int(R[i, j]) + int(R[j, i])
+            after = before + (1 if value else -1)
+            counts = ['unrelated_pairs', 'one_way_pairs', 'two_way_pairs']
+            setattr(self, counts[before], getattr(self, counts[before]) - 1)
+            setattr(self, counts[after], getattr(self, counts[after]) + 1)
+
+        # only row i and column j of paths change: the paths i -> j -> z and x -> i -> j
+        old = self._violations_through(i, j)
+        sign = 1 if value else -1
+        from_j = R[j].astype(np.int32)
+        to_i = R[:, i].astype(np.int32)
+        self.paths[i] += sign * from_j
+        self.paths[:, j] += sign * to_i
+        if i == j:
+            # (R +- E) @ (R +- E) = R @ R +- (E @ R + R @ E) + E @ E: the path i -> i -> i
+            self.paths[i, j] += 1
+        R[i, j] = value
+        self.transitivity_violations += self._violations_through(i, j) - old
+        return True
+
+    def _violations_through(self, i, j):
+        """the violations of transitivity counted in row i and column j of paths"""
+        missing_row = ~self.matrix_np[i]
+        missing_column = ~self.matrix_np[:, j]
+        total = int(self.paths[i][missing_row].sum(dtype=np.int64))
+        total += int(self.paths[:, j][missing_column].sum(dtype=np.int64))
+        if missing_row[j]:
+            total -= int(self.paths[i, j])
+        return total
+
+    def counts(self):
+        """all the counts, by name"""
+        return {name: getattr(self, name) for name in (
+            'loops', 'missing_loops', 'unrelated_pairs', 'one_way_pairs', 'two_way_pairs',
+            'transitivity_violations')}
+
+    def holds(self, name):
+        """whether the relation has the property, from the counts"""
+        if name == 'reflexive':
+            return self.missing_loops == 0
+        if name == 'complete':
+            return self.unrelated_pairs == 0 and self.missing_loops == 0
+        if name == 'asymmetric':
+            return self.two_way_pairs == 0 and self.loops == 0
+        if name == 'symmetric':
+            return self.one_way_pairs == 0
+        if name == 'antisymmetric':
+            return self.two_way_pairs == 0
+        if name == 'transitive':
+            return self.transitivity_violations == 0
+        if name == 'total_order':
+            return self.holds('complete') and self.holds('antisymmetric') and self.holds('transitive')
+        if name == 'complete_preorder':
+            return self.holds('complete') and self.holds('transitive')
+        raise ValueError(f"unknown property {name!r}, expected one of {self.PROPERTIES}")
+
+    def results(self):
+        """{name: bool} for all the properties"""
+        return {name: self.holds(name) for name in self.PROPERTIES}
+
+    def report(self, block_size=1024):
+        """RelationReport of a copy of the current relation, with the messages and witnesses"""
+        return RelationReport(self.matrix_np.astype(int), self.nodes, block_size)
+
+
+def _transposed(relation, block_size=1024):
+    """the transposed PackedRelation, computed tile by tile"""
+    n = relation.n
+    block_size = max(64, block_size // 64 * 64)
+    words = np.empty_like(relation.words)
+    for i0 in range(0, n, block_size):
+        i1 = min(i0 + block_size, n)
+        for j0 in range(0, n, block_size):
+            j1 = min(j0 + block_size, n)
+            tile = relation.transposed_tile(i0, i1, j0, j1)
+            words[i0:i1, j0 // 64:j0 // 64 + tile.shape[1]] = tile
+    return PackedRelation(words, n)
+
+
+def _relation_part(part, output):
+    """a part of the relation (PackedRelation) as booleans, a sparse matrix or packed"""
+    if output == 'packed':
+        return part
+    if output == 'sparse':
+        from scipy import sparse
+        rows, cols = part.edges()
+        return sparse.csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)), shape=(part.n, part.n))
+    return part.rows(0, part.n)
+
+
+def RelationParts(matrix_np, output='bool', block_size=1024):
+    """
+    the asymmetric, symmetric and incomparability parts of the relation R, from one pass over it:
+    P = R and not R^T (aPb: aRb but NOT bRa)
+    I = R and R^T (aIb: aRb AND bRa, includes aIa)
+    J = not R and not R^T (aJb: neither aRb nor bRa, includes aJa when a has no loop)
+
+    output - 'bool' for boolean matrices, 'sparse' for scipy sparse (csr) matrices,
+    'packed' for PackedRelations
+    returns P, I, J"""
+    if output not in ('bool', 'sparse', 'packed'):
+        raise ValueError(f"output should be 'bool', 'sparse' or 'packed', got {output!r}")
+
+    if isinstance(matrix_np, PackedRelation):
+        words = matrix_np.words
+        transposed = _transposed(matrix_np, block_size).words
+        n = matrix_np.n
+        parts = (words & ~transposed, words & transposed, ~(words | transposed) & matrix_np.valid_mask())
+        return tuple(_relation_part(PackedRelation(part, n), output) for part in parts)
+
+    matrix_np = np.asarray(matrix_np)
+    n = len(matrix_np)
+    if output == 'packed':
+        return RelationParts(PackedRelation.from_matrix(matrix_np), output, block_size)
+
+    if output == 'bool':
+        parts = tuple(np.empty((n, n), dtype=bool) for _ in range(3))
+    else:
+        edges = tuple(([], []) for _ in range(3))
+    for i0 in range(0, n, block_size):
+        i1 = min(i0 + block_size, n)
+        rows = matrix_np[i0:i1] == 1
+        columns = matrix_np[:, i0:i1].T == 1
+        blocks = (rows & ~columns, rows & columns, ~(rows | columns))
+        for k, block in enumerate(blocks):
+            if output == 'bool':
+                parts[k][i0:i1] = block
+            else:
+                block_rows, block_cols = np.nonzero(block)
+                edges[k][0].append(block_rows + i0)
+                edges[k][1].append(block_cols)
+
+    if output == 'bool':
+        return parts
+    from scipy import sparse
+    return tuple(sparse.csr_matrix((np.ones(sum(map(len, rows)), dtype=bool),
+                                    (np.concatenate(rows or [[]]).astype(np.int64),
+                                     np.concatenate(cols or [[]]).astype(np.int64))), shape=(n, n))
+                 for rows, cols in edges)
+
+
+def StrictRelation(matrix_np, output='bool'):
+    """getting the asymmetric part of the relation: for a and b, aRb but NOT bRa
+    (a boolean matrix, see RelationParts for the other outputs)"""
+    return RelationParts(matrix_np, output)[0]
+
+
+def IndifferenceRelation(matrix_np, output='bool'):
+    """getting the symmetric part of the relation: for a and b, aRb AND bRa, includes aRa
+    (a boolean matrix, see RelationParts for the other outputs)"""
+    return RelationParts(matrix_np, output)[1]
+
+
+def _edge_list(matrix_np, block_size=4096):
+    """the pairs (rows, cols) of the relation, row by row"""
+    if isinstance(matrix_np, PackedRelation):
+        return matrix_np.edges()
+    rows, cols = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for i0 in range(0, len(matrix_np), block_size):
+        block_rows, block_cols = np.nonzero(np.asarray(matrix_np[i0:i0 + block_size]) == 1)
+        rows.append(block_rows + i0)
+        cols.append(block_cols)
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def AdjacencyLists(matrix_np, block_size=4096):
+    """the relation as sparse adjacency lists (CSR), without the edges of nodes to themselves
+    indptr - the successors of node i are indices[indptr[i]:indptr[i + 1]], sorted"""
+    n = len(matrix_np)
+    rows, cols = _edge_list(matrix_np, block_size)
+
+    not_loop = rows != cols
+    rows, indices = rows[not_loop], cols[not_loop]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, indices
+
+
+def _successors_of(indptr, indices, nodes):
+    """all the successors of the given nodes, concatenated"""
+    lengths = indptr[nodes + 1] - indptr[nodes]
+    offsets = np.repeat(indptr[nodes] - (np.cumsum(lengths) - lengths), lengths)
+    return indices[offsets + np.arange(lengths.sum())]
+
+
+def _kahn_order(indptr, indices):
+    """the nodes in the order Kahn's algorithm removes them, all the nodes without
+    incoming edges at once; the nodes on a cycle or after one are never removed"""
+    n = len(indptr) - 1
 
     # Counting number of incoming edges for each node
     # changes with each step
-    n_incoming_edges = defaultdict(int)
-    for i in range(len(matrix_np)):
-        for j in range(len(matrix_np)):
-            if i == j: # edge to itself is not important
-                continue
-            n_incoming_edges[j] += matrix_np[i][j]
-    # print(n_incoming_edges)
+    n_incoming_edges = np.bincount(indices, minlength=n)
+    no_incoming = np.flatnonzero(n_incoming_edges == 0)
+
+    order = [] # to store the final order
+    while len(no_incoming):
+        order.extend(no_incoming.tolist())
+
+        # update incoming edges for the remaining nodes
+        # when removing the current nodes
+        successors = _successors_of(indptr, indices, no_incoming)
+        np.subtract.at(n_incoming_edges, successors, 1)
+        no_incoming = np.unique(successors[n_incoming_edges[successors] == 0])
+    return order
 
-    # Store the nodes with no incoming edges in a queue
-    no_incoming = deque([i for i, n_incoming in n_incoming_edges.items() if n_incoming==0])
-    # print(no_incoming)
 
-    while no_incoming:
-        curr_i = no_incoming.popleft()
-        topological_order.append(curr_i)
+def _reversed_lists(indptr, indices):
+    """adjacency lists (CSR) of the predecessors"""
+    n = len(indptr) - 1
+    sources = np.repeat(np.arange(n), np.diff(indptr))
+    order = np.argsort(indices, kind='stable')
+    reversed_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n), out=reversed_indptr[1:])
+    return reversed_indptr, sources[order]
 
-        # update incoming edges for the remaining nodes 
-        # when removign the current node
-        for j in range(len(matrix_np)):
 
-            if j in topological_order:
+def StronglyConnectedComponents(matrix_np):
+    """strongly connected components, as lists of nodes, in a topological order of the components.
+    The nodes before and after all the cycles are removed first with Kahn's algorithm
+    from both ends, Tarjan's algorithm (O(n + m)) only runs on the remaining nodes"""
+    indptr, indices = AdjacencyLists(matrix_np)
+    n = len(indptr) - 1
+    first = _kahn_order(indptr, indices)
+    if len(first) == n:
+        return [[v] for v in first]
+    # the nodes with only descendants removed by Kahn's algorithm on the predecessors,
+    # without the ones already removed from the front
+    in_first = np.zeros(n, dtype=bool)
+    in_first[first] = True
+    last = [v for v in _kahn_order(*_reversed_lists(indptr, indices)) if not in_first[v]]
+    remaining = ~in_first
+    remaining[last] = False
+
+    indptr, indices = indptr.tolist(), indices.tolist()
+    remaining = remaining.tolist()
+
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+    for root in range(n):
+        if index[root] != -1 or not remaining[root]:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        # depth-first search without recursion: (node, position in its successors)
+        work = [(root, indptr[root])]
+        while work:
+            v, ptr = work[-1]
+            if ptr < indptr[v + 1]:
+                work[-1] = (v, ptr + 1)
+                w = indices[ptr]
+                if not remaining[w]:
+                    continue
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, indptr[w]))
+                elif on_stack[w]:
+                    low[v] = min(low[v], index[w])
                 continue
-            
-            if matrix_np[curr_i][j] == 1:
-                n_incoming_edges[j] -= 1
-                if n_incoming_edges[j] == 0:
-                    no_incoming.append(j)
-        # print('n_incoming',n_incoming_edges)
-        # print('no_incoming', no_incoming)
-        # print('order', topological_order)
-    
-    # the node without incoming edges finished too soon --> cycles
-    if len(topological_order) != len(matrix_np):
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(sorted(component))
+
+    # Tarjan's algorithm finds the components in reverse topological order
+    components.reverse()
+    return [[v] for v in first] + components + [[v] for v in reversed(last)]
+
+
+def HasseDiagram(matrix_np):
+    """
+    the Hasse diagram of the relation: every strongly connected component (cycle) is merged
+    into one node, and only the pairs of components not implied by transitivity are kept
+    (transitive reduction of the condensed graph). Self-loops are ignored.
+
+    components - lists of nodes, in topological order
+    edges - (sources, targets), arrays of indices of components
+    """
+    components = StronglyConnectedComponents(matrix_np)
+    k = len(components)
+    component_of = np.empty(len(matrix_np), dtype=np.int64)
+    for c, component in enumerate(components):
+        component_of[component] = c
+
+    # the condensed graph, its pairs go from a component to a later one
+    rows, cols = _edge_list(matrix_np)
+    pairs = np.sort(component_of[rows] * k + component_of[cols])
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+    rows, cols = pairs // k, pairs % k
+    different = rows != cols
+    rows, cols = rows[different], cols[different]
+    indptr = np.zeros(k + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=k), out=indptr[1:])
+
+    # from the last component to the first: reachable[c] are the components reachable from c
+    # as bits, a pair c -> d is implied by transitivity if d is reachable from another successor
+    reachable = np.zeros((k, (k + 7) // 8), dtype=np.uint8)
+    keep = np.zeros(len(cols), dtype=bool)
+    for c in range(k - 1, -1, -1):
+        successors = cols[indptr[c]:indptr[c + 1]]
+        if len(successors) == 0:
+            continue
+        indirect = np.bitwise_or.reduce(reachable[successors], axis=0)
+        keep[indptr[c]:indptr[c + 1]] = (indirect[successors >> 3] >> (successors & 7).astype(np.uint8)) & 1 == 0
+        reachable[c] = indirect
+        np.bitwise_or.at(reachable[c], successors >> 3, (1 << (successors & 7)).astype(np.uint8))
+
+    return components, (rows[keep], cols[keep])
+
+
+def Topologicalsorting(matrix_np, condense=False):
+    """Perform topological sorting
+    Kahn's algorithm on the adjacency lists, all the nodes without incoming edges
+    are removed at once, O(n + m)
+    returns the order if you have no cycles, returns None if you have cycles
+    condense - if you have cycles, return the order of the strongly connected components
+    (lists of nodes) instead of None"""
+    indptr, indices = AdjacencyLists(matrix_np)
+    n = len(indptr) - 1
+    topological_order = _kahn_order(indptr, indices)
+
+    # the nodes without incoming edges finished too soon --> cycles
+    if len(topological_order) != n:
         print("Couldn't compute topological order. The relation has cycles.")
+        if condense:
+            components = StronglyConnectedComponents(matrix_np)
+            print(f"Topological order of the strongly connected components: {components}")
+            return components
         return None # so return None
     else:
         print(f"Topological order: {topological_order}")
         return topological_order
 
+RELATION_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.tsv', '.txt', '.npz', '.npy')
+
+
+def relation_files(pattern):
+    """the files of relations in a directory (all the files with a known extension),
+    or matching a glob pattern, sorted"""
+    if os.path.isdir(pattern):
+        return sorted(os.path.join(pattern, name) for name in os.listdir(pattern)
+                      if os.path.splitext(name)[1].lower() in RELATION_EXTENSIONS)
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def _check_file(path, block_size=1024):
+    """one row of the batch: the file, its number of nodes and a flag per property"""
+    row = {'file': path, 'nodes': None, 'error': ''}
+    try:
+        matrix_np, nodes = reading_relation(path)
+        row['nodes'] = len(matrix_np)
+        results = RelationReport(matrix_np, nodes, block_size).results()
+        row.update({name: result['holds'] for name, result in results.items()})
+    except Exception as error:
+        # a broken file is reported in its row, the other files are still checked
+        row['error'] = f"{type(error).__name__}: {error}"
+    return row
+
+
+def check_relations(files, output=None, n_workers=None, block_size=1024):
+    """
+    check all the properties of every relation, in a pool of n_workers processes
+    files - list of files, or a directory or a glob pattern (see relation_files)
+    output - write one row per relation to this .csv or .parquet file (parquet needs pandas)
+
+    returns the rows: {'file', 'nodes', 'error', then True/False for every property of RelationReport}
+    """
+    if isinstance(files, str):
+        files = relation_files(files)
+    n_workers = n_workers or os.cpu_count()
+    if n_workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            rows = list(pool.map(_check_file, files, [block_size] * len(files),
+                                 chunksize=max(1, len(files) // (8 * n_workers))))
+    else:
+        rows = [_check_file(path, block_size) for path in files]
+
+    if output is not None:
+        columns = ['file', 'nodes', 'error'] + list(RelationReport.BASIC + RelationReport.COMPOUND)
+        if output.endswith('.parquet'):
+            import pandas as pd
+
+            pd.DataFrame(rows, columns=columns).to_parquet(output, index=False)
+        else:
+            with open(output, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(rows)
+    return rows
+
+
 if __name__ == "__main__":
     """run as python check_binaryRelation_properties.py <filename>
-    where <filename> is the name of the spreadsheet to take the binary relation from"""
+    where <filename> is the name of the file to take the binary relation from:
+    a spreadsheet (matrix), an edge list (.csv/.tsv), a sparse matrix (.npz) or a matrix (.npy)
+    or python check_binaryRelation_properties.py <filename> <image>
+    to save the Hasse diagram of the relation to <image> (e.g. hasse.png) instead of showing the graph
+    or python check_binaryRelation_properties.py <directory or glob> --batch <output.csv or .parquet>
+    to check all the relations, one row of properties per relation"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check the properties of binary relations')
+    parser.add_argument('input', help='file of the relation, or directory/glob pattern with --batch')
+    parser.add_argument('image', nargs='?', help='save the Hasse diagram to this file')
+    parser.add_argument('--batch', metavar='OUTPUT', help='check all the relations, write the properties here')
+    parser.add_argument('--workers', type=int, default=None, help='processes of the batch, all the CPUs by default')
+    args = parser.parse_args()
+
+    if args.batch:
+        rows = check_relations(args.input, args.batch, args.workers)
+        failed = [row['file'] for row in rows if row['error']]
+        print(f"Checked {len(rows)} relations, {len(failed)} could not be read, written to {args.batch}")
+        sys.exit(0)
+
     # the path to the excel file
-    input = sys.argv[1]
+    input = args.input
+    image = args.image
 
     # input = 'matrix_input.xlsx'
-    matrix_np,nodes = reading_excel(input)
-    Visualizebinaryrelation(matrix_np,nodes)
-    ReflexiveCheck(matrix_np,nodes)
-    CompleteCheck(matrix_np,nodes)
-    AsymmetricCheck(matrix_np,nodes)
-    SymmetricCheck(matrix_np,nodes)
-    AntisymmetricCheck(matrix_np,nodes)
-    TransitiveCheck(matrix_np,nodes)
-    NegativetransitiveCheck(matrix_np, nodes)
-    CompleteOrderCheck(matrix_np, nodes)
-    CompletePreOrderCheck(matrix_np,nodes)
-    asymmetric_np = StrictRelation(matrix_np)
-    print(f"Asymmetric part:\n {asymmetric_np}")
-    symmetric_np = IndifferenceRelation(matrix_np)
-    print(f"Symmetric part:\n {symmetric_np}")
-    topological_order = Topologicalsorting(matrix_np)
+    matrix_np,nodes = reading_relation(input)
+    Visualizebinaryrelation(matrix_np, nodes, image, hasse=image is not None)
+    # every property is computed once, the compound ones reuse them
+    RelationReport(matrix_np, nodes).print_report()
+    # both parts from one pass over the relation
+    asymmetric_np, symmetric_np, _ = RelationParts(matrix_np)
+    print(f"Asymmetric part:\n {asymmetric_np.astype(int)}")
+    print(f"Symmetric part:\n {symmetric_np.astype(int)}")
+    topological_order = Topologicalsorting(matrix_np, condense=True)
@@ -0,0 +1,89 @@
+"""Benchmark of the solvers of the itinerary problems on synthetic sites
+
+run as python benchmark_solvers.py [--sizes 13 100 500] [--output results.json]
+every combination of a few preferences is solved with each solver, the latency per solve
+is written as json so that the solvers (and the runs of different commits) can be compared"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+
+from pulp import PULP_CBC_CMD
+
+from itinerary import ScenarioEngine, build_model
+from solvers import BINARY_ENUMERATION, SCIPY_MILP
+
+def synthetic_sites(n_sites, seed=0):
+    """durations and prices of sites like the ones of Paris: one to a few hours,
+    free or up to 20 euros"""
+    rng = random.Random(seed)
+    sites = [f"site_{i}" for i in range(n_sites)]
+    durations = {site: rng.choice([0.75, 1, 1.5, 2, 2.5, 3, 4.5]) for site in sites}
+    prices = {site: rng.choice([0, 0, 5, 8, 9.5, 10, 12, 15.5]) for site in sites}
+    return durations, prices
+
+def synthetic_engine(n_sites, solver, seed=0):
+    """the model of n_sites sites (a day per 13 sites) with 4 groups of preferences like the ones of Paris"""
+    durations, prices = synthetic_sites(n_sites, seed)
+    days = max(1, n_sites // 13)
+    prob, visits = build_model(durations, prices, max_time=12 * days, budget=65 * days)
+    engine = ScenarioEngine(prob, visits, durations, prices, solver)
+
+    rng = random.Random(seed)
+    x = list(visits.values())
+    a, b, c, d = rng.sample(x, 4)
+    engine.add_group("together", [a + b <= 2 * c, a + b >= c])
+    engine.add_group("both", [c + d == 2])
+    engine.add_group("not_both", [a + d <= 1])
+    engine.add_group("one", [b == 1])
+    return engine
+
+def _solvers():
+    """name: function returning a new solver"""
+    return {
+        'cbc': lambda: PULP_CBC_CMD(msg=False),
+        'cbc_warm_start': lambda: PULP_CBC_CMD(msg=False, warmStart=True),
+        'highs_in_process': lambda: SCIPY_MILP(msg=False),
+        'default': lambda: BINARY_ENUMERATION(msg=False),
+    }
+
+def run_benchmark(sizes, repeat=3, seed=0):
+    """Latency of each solve of every combination of the preferences, for each solver and number of sites"""
+    results = []
+    for n_sites in sizes:
+        objectives = {}
+        for name, solver in _solvers().items():
+            engine = synthetic_engine(n_sites, solver(), seed)
+            groups = list(engine.groups)
+            combinations = [[g for k, g in enumerate(groups) if mask >> k & 1] for mask in range(2 ** len(groups))]
+            latencies = []
+            for _ in range(repeat):
+                for combination in combinations:
+                    start = time.perf_counter()
+                    prob = engine.solve(combination)
+                    latencies.append(time.perf_counter() - start)
+                    objectives.setdefault(name, []).append(engine.result(prob)['visited'])
+            results.append({
+                'sites': n_sites, 'solver': name, 'solves': len(latencies),
+                'median_seconds': statistics.median(latencies), 'mean_seconds': statistics.fmean(latencies),
+                'max_seconds': max(latencies)})
+            print(f"{n_sites:>6} {name:<18} {statistics.median(latencies) * 1000:10.2f}ms median "
+                  f"{max(latencies) * 1000:10.2f}ms max")
+        # the optimal number of sites doesn't depend on the solver
+        if len({tuple(values) for values in objectives.values()}) != 1:
+            print(f"warning: the solvers disagree on the number of sites visited for {n_sites} sites")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[13, 100, 500], help='numbers of sites')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of all the combinations per solver')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_solvers.json')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.repeat, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump({'python': platform.python_version(), 'results': results}, f, indent=2)
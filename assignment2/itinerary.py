@@ -0,0 +1,198 @@
+"""itinerary - the linear program of the visit of the sites, built from their durations and prices"""
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from pulp import LpInteger, LpMaximize, LpProblem, LpStatus, LpVariable, lpSum
+
+from solvers import default_solver
+
+
+def read_sites(filename):
+    """
+    read the sites from a csv file with a header and the columns
+    site, duration (hours), price (euros) and optionally appreciation
+
+    returns durations, prices, appreciations as dicts {site: value} (appreciations is empty
+    without the column)
+    """
+    durations, prices, appreciations = {}, {}, {}
+    with open(filename, newline='') as f:
+        for row in csv.DictReader(f):
+            site = row['site'].strip()
+            durations[site] = float(row['duration'])
+            prices[site] = float(row['price'])
+            if row.get('appreciation') not in (None, ''):
+                appreciations[site] = float(row['appreciation'])
+    return durations, prices, appreciations
+
+
+def visit_variables(sites):
+    """the binary variables: a site is visited once (1) or not at all (0)"""
+    return {site: LpVariable(site, 0, 1, LpInteger) for site in sites}
+
+
+def build_model(durations, prices, max_time=12, budget=65, visits=None, name="Visiting_Paris"):
+    """
+    the linear program maximizing the number of sites visited within the time and the budget:
+    max sum(x) s.t. sum(duration * x) <= max_time, sum(price * x) <= budget
+
+    durations, prices - dicts {site: value} with the same sites
+    visits - the variables of the sites, new ones (visit_variables) if not given
+
+    returns prob, visits. The model is built once, prob.copy() gives a problem sharing
+    its objective and constraints to which the constraints of a scenario can be added
+    """
+    if visits is None:
+        visits = visit_variables(durations)
+
+    prob = LpProblem(name, LpMaximize)
+
+    # The objective function: the number of sites visited
+    prob += lpSum(visits.values())
+
+    # The constraints
+    prob += lpSum(durations[site] * x for site, x in visits.items()) <= max_time, "time"
+    prob += lpSum(prices[site] * x for site, x in visits.items() if prices[site]) <= budget, "money"
+    return prob, visits
+
+
+def visited_sites(prob, visits):
+    """the sites visited in the solution of prob, sorted by name like prob.variables()"""
+    return sorted(site for site, x in visits.items() if x.varValue == 1)
+
+
+class ScenarioEngine:
+    """
+    the base model and groups of preference constraints switched on and off.
+    The problem of a scenario is a copy of the base model with the constraints of the
+    active groups (nothing is built again). The small problems are solved in this process by
+    checking every plan, the others by CBC starting from the solution of the previous scenario
+    (warm start: the variables, and so their values, are shared).
+
+    prob, visits - the base model and its variables, from build_model
+    solver - the pulp solver, default_solver() if not given
+
+    engine.add_group('pref2', [TE + CA == 2]); engine.enable('pref2'); prob = engine.solve()
+    or engine.solve(['pref1', 'pref2']) for a given combination
+    """
+
+    def __init__(self, prob, visits, durations, prices, solver=None):
+        self.prob = prob
+        self.visits = visits
+        self.durations = durations
+        self.prices = prices
+        self.solver = solver or default_solver()
+        # name: constraints, in the order they were added
+        self.groups = {}
+        self.active = []
+
+    def add_group(self, name, constraints, active=False):
+        """a group of constraints that is switched on and off at once"""
+        self.groups[name] = list(constraints)
+        if active:
+            self.enable(name)
+
+    def enable(self, *names):
+        for name in names:
+            if name not in self.groups:
+                raise KeyError(f"unknown group of constraints {name!r}")
+            if name not in self.active:
+                self.active.append(name)
+
+    def disable(self, *names):
+        self.active = [name for name in self.active if name not in names]
+
+    def scenario(self, names=None):
+        """the problem of the given groups (the active ones if None), not solved"""
+        names = self.active if names is None else names
+        prob = self.prob.copy()
+        for name in names:
+            for k, constraint in enumerate(self.groups[name]):
+                prob.addConstraint(constraint, f"{name}_{k}")
+        return prob
+
+    def solve(self, names=None):
+        """solve the problem of the given groups (the active ones if None), returns it"""
+        prob = self.scenario(names)
+        prob.solve(self.solver)
+        return prob
+
+    def result(self, prob):
+        """status, sites visited, money and time spent in the solution of prob"""
+        status = LpStatus[prob.status]
+        sites = visited_sites(prob, self.visits) if status == 'Optimal' else []
+        return {
+            'status': status,
+            'sites': sites,
+            'visited': len(sites),
+            'money': sum(self.prices[site] for site in sites),
+            'time': sum(self.durations[site] for site in sites)}
+
+
+# the engine of the worker processes of enumerate_scenarios
+_engine = None
+
+
+def _init_worker(engine):
+    global _engine
+    _engine = engine
+
+
+def _solve_groups(names):
+    return _engine.result(_engine.solve(names))
+
+
+def enumerate_scenarios(engine, groups=None, reference=None, n_workers=None):
+    """
+    solve every combination of the groups of constraints (2**k for k groups), in a pool of
+    n_workers processes (in this process if n_workers is 1).
+    The combinations are solved by number of groups: adding constraints can't make an infeasible
+    problem feasible, so the combinations containing an infeasible one are not solved (pruned)
+
+    groups - the groups of the engine to combine, all of them if None
+    reference - the sites of the plan to compare to, the plan without any group if None
+
+    returns a pandas DataFrame with a row per combination: preferences, status, visited, money,
+    time, sites, differs (from the reference), pruned
+    """
+    import pandas as pd
+
+    groups = list(engine.groups) if groups is None else list(groups)
+    results = {}
+    infeasible = []
+    pool = None if n_workers == 1 else ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(engine,))
+    try:
+        for size in range(len(groups) + 1):
+            to_solve = []
+            for subset in combinations(groups, size):
+                if any(set(bad) <= set(subset) for bad in infeasible):
+                    results[subset] = {'status': 'Infeasible', 'sites': [], 'visited': 0, 'money': 0, 'time': 0,
+                                       'pruned': True}
+                else:
+                    to_solve.append(subset)
+
+            if pool is None:
+                solved = [engine.result(engine.solve(subset)) for subset in to_solve]
+            else:
+                solved = pool.map(_solve_groups, to_solve)
+            for subset, result in zip(to_solve, solved):
+                results[subset] = dict(result, pruned=False)
+                if result['status'] == 'Infeasible':
+                    infeasible.append(subset)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if reference is None:
+        reference = results[()]['sites']
+    rows = [{
+        'preferences': ','.join(subset),
+        'status': result['status'],
+        'visited': result['visited'],
+        'money': result['money'],
+        'time': result['time'],
+        'sites': ', '.join(result['sites']),
+        'differs': result['status'] == 'Optimal' and result['sites'] != list(reference),
+        'pruned': result['pruned']} for subset, result in results.items()]
+    return pd.DataFrame(rows)
@@ -1,5 +1,8 @@
 from pulp import *
 
+from itinerary import ScenarioEngine, build_model, enumerate_scenarios
+from pareto import pareto_front
+
 # the rankings
 durations = {
     'Arc_de_Triomphe': 1,
@@ -64,33 +67,28 @@ def calculate_variables(prices, durations, prob):
 
 print("-------------------Section 1-------------------")
 
-# defining that all attractions can be visited once or not at all
-TE = LpVariable("Eiffel_Tower",0,1,LpInteger)
-ML = LpVariable("Museum_Louvre",0,1,LpInteger)
-AT = LpVariable("Arc_de_Triomphe",0,1,LpInteger)
-MO = LpVariable("Museum_Orsay",0,1,LpInteger)
-JT = LpVariable("Jardin_Tuileries",0,1,LpInteger)
-CA = LpVariable("Catacombes",0,1,LpInteger)
-CP = LpVariable("Centre_Pompidou",0,1,LpInteger)
-CN = LpVariable("Cathedrale_Notre_Dame",0,1,LpInteger)
-BS = LpVariable("Basilique_du_Sacre_Coeur",0,1,LpInteger)
-SC = LpVariable("Sainte_Chapelle",0,1,LpInteger)
-PC = LpVariable("Place_de_la_Concorde",0,1,LpInteger)
-TM = LpVariable("Tour_Montparnasse",0,1,LpInteger)
-AC = LpVariable("Avenue_des_Champs_Elysees",0,1,LpInteger)
+# defining that all attractions can be visited once or not at all,
+# the variables and the constraints are built from the durations and the prices
+base_prob, visits = build_model(durations, prices, max_time=12, budget=65)
+TE = visits["Eiffel_Tower"]
+ML = visits["Museum_Louvre"]
+AT = visits["Arc_de_Triomphe"]
+MO = visits["Museum_Orsay"]
+JT = visits["Jardin_Tuileries"]
+CA = visits["Catacombes"]
+CP = visits["Centre_Pompidou"]
+CN = visits["Cathedrale_Notre_Dame"]
+BS = visits["Basilique_du_Sacre_Coeur"]
+SC = visits["Sainte_Chapelle"]
+PC = visits["Place_de_la_Concorde"]
+TM = visits["Tour_Montparnasse"]
+AC = visits["Avenue_des_Champs_Elysees"]
 
 def create_InitState():
     """Initiating the linear programming problem with the default objective function
-    and the constraints, used throughout Section 1 and 2"""
-    prob = LpProblem("Visiting_Paris", LpMaximize)
-
-    # The objective function
-    prob += TE+ML+AT+MO+JT+CA+CP+CN+BS+SC+PC+TM+AC # the sum of all visits of sites
-
-    # The constraints
-    prob += 4.5*TE+3*ML+1*AT+2*MO+1.5*JT+2*CA+2.5*CP+2*CN+2*BS+1.5*SC+0.75*PC+2*TM+1.5*AC<=12
-    prob += 15.5*TE+12*ML+9.5*AT+11*MO+10*CA+10*CP+5*CN+8*BS+8.5*SC+15*TM<=65
-    return prob
+    and the constraints, used throughout Section 1 and 2:
+    a copy of the base model, the constraints are not built again"""
+    return base_prob.copy()
 
 prob = create_InitState()
 prob.solve(PULP_CBC_CMD(msg=False))
@@ -101,9 +99,13 @@ print("\n")
 print("-------------------Section 2-------------------")
 print("\n")
 
-print("------------------Preference 1-----------------")
+# one base model, the preferences are groups of constraints switched on and off.
+# Several plans visit the same number of sites: started from the previous solution
+# (the default warm start) CBC can return another one of them, so the plans below
+# are solved from scratch to stay the ones of the report
+engine = ScenarioEngine(base_prob, visits, durations, prices, PULP_CBC_CMD(msg=False))
 
-prob = create_InitState()
+print("------------------Preference 1-----------------")
 
 # or operator for each pair that is within 1 km
 MO_JT = pulp.LpVariable("MO_JT", 0, 1, LpInteger)
@@ -120,11 +122,9 @@ pref1 = [
     MO + JT == 2 * MO_JT, CP + CN == 2 * CP_CN, ML + SC == 2 * ML_SC, 
     SC + CP == 2 * SC_CP, CN + SC == 2 * CN_SC, PC + MO == 2 * PC_MO, 
     PC + JT == 2 * PC_JT, AT + AC == 2 * AT_AC]
+engine.add_group("pref1", pref1)
 
-for constr in pref1:
-    prob += constr
-
-prob.solve(PULP_CBC_CMD(msg=False))
+prob = engine.solve(["pref1"])
 print("Status: ",LpStatus[prob.status])
 
 ListVisit2 = calculate_variables(prices, durations, prob)
@@ -133,15 +133,11 @@ print("\n")
 
 print("------------------Preference 2-----------------")
 
-prob = create_InitState()
-
 # The preference
 pref2 = [TE+CA == 2]
+engine.add_group("pref2", pref2)
 
-for constr in pref2:
-    prob += constr
-
-prob.solve(PULP_CBC_CMD(msg=False))
+prob = engine.solve(["pref2"])
 print("Status: ",LpStatus[prob.status])
 
 ListVisit3 = calculate_variables(prices, durations, prob)
@@ -150,13 +146,10 @@ print("\n")
 
 print("------------------Preference 3-----------------")
 
-prob = create_InitState()
-
 pref3 = [CN+SC<=1]
-for constr in pref3:
-    prob +=  constr
+engine.add_group("pref3", pref3)
 
-prob.solve(PULP_CBC_CMD(msg=False))
+prob = engine.solve(["pref3"])
 print("Status: ",LpStatus[prob.status])
 
 ListVisit4 = calculate_variables(prices, durations, prob)
@@ -165,14 +158,11 @@ print("\n")
 
 print("------------------Preference 4-----------------")
 
-prob = create_InitState()
-
 # The preference
 pref4 = [TM == 1]
-for constr in pref4:
-    prob += constr
+engine.add_group("pref4", pref4)
 
-prob.solve(PULP_CBC_CMD(msg=False))
+prob = engine.solve(["pref4"])
 print("Status: ",LpStatus[prob.status])
 
 ListVisit5 = calculate_variables(prices, durations, prob)
@@ -181,175 +171,60 @@ print("\n")
 
 print("------------------Preference 5-----------------")
 
-prob = create_InitState()
-
 # representing the OR condition
 ML_CP = pulp.LpVariable("ML_CP", 0, 1, LpInteger)
 
 # The preference
 pref5 = [ML + CP == 2 * ML_CP] 
-for constr in pref5:
-    prob += constr 
+engine.add_group("pref5", pref5)
 
-prob.solve(PULP_CBC_CMD(msg=False))
+prob = engine.solve(["pref5"])
 print("Status: ",LpStatus[prob.status])
 
 ListVisit6 = calculate_variables(prices, durations, prob)
 print("Different from ListVisit1: ", ListVisit6!=ListVisit1)
 print("\n")
 
-print("----------------Preferences 1,2----------------")
-
-prob = create_InitState()
-
-# The preference
-for constr in pref1+pref2:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
-
-ListVisit1_2 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit1_2!=ListVisit1)
-print("\n")
-
-print("----------------Preferences 1,3----------------")
-
-prob = create_InitState()
-
-# The preference
-for constr in pref1+pref3:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
-
-ListVisit1_3 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit1_3!=ListVisit1)
-print("\n")
-
-print("----------------Preferences 1,4----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref1+pref4:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
-
-ListVisit1_4 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit1_4!=ListVisit1)
-print("\n")
-
-print("----------------Preferences 2,5----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref2+pref5:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
-ListVisit2_5 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit2_5!=ListVisit1)
-print("\n")
-
-print("----------------Preferences 3,4----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref3+pref4:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
-
-ListVisit3_4 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit3_4!=ListVisit1)
-print("\n")
-
-print("----------------Preferences 4,5----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref4+pref5:
-    prob += constr 
+# the combinations of preferences: (title, groups)
+combinations = [
+    ("Preferences 1,2", ["pref1", "pref2"]),
+    ("Preferences 1,3", ["pref1", "pref3"]),
+    ("Preferences 1,4", ["pref1", "pref4"]),
+    ("Preferences 2,5", ["pref2", "pref5"]),
+    ("Preferences 3,4", ["pref3", "pref4"]),
+    ("Preferences 4,5", ["pref4", "pref5"]),
+    ("Preferences 1,2,4", ["pref2", "pref1", "pref4"]),
+    ("Preferences 2,3,5", ["pref2", "pref5", "pref3"]),
+    ("Preferences 2,3,4,5", ["pref2", "pref5", "pref3", "pref4"]),
+    ("Preferences 1,2,4,5", ["pref2", "pref5", "pref1", "pref4"]),
+    ("Preferences 1,2,3,4,5", ["pref1", "pref2", "pref3", "pref4", "pref5"])]
 
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
+ListVisits = {}
+for title, groups in combinations:
+    print(f"{'-' * 16}{title}{'-' * 16}")
 
-ListVisit4_5 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit4_5!=ListVisit1)
-print("\n")
+    prob = engine.solve(groups)
+    print("Status: ",LpStatus[prob.status])
 
-print("----------------Preferences 1,2,4----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref2+pref1+pref4:
-    prob += constr 
+    ListVisits[title] = calculate_variables(prices, durations, prob)
+    print("Different from ListVisit1: ", ListVisits[title]!=ListVisit1)
+    print("\n")
 
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
+print("------------All combinations of preferences------------")
 
-ListVisit1_2_4 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit1_2_4!=ListVisit1)
+# every combination of the 5 preferences, the ones containing an infeasible combination are pruned.
+# In this process: the script runs when imported, so worker processes started by spawn would run it again
+table = enumerate_scenarios(engine, reference=ListVisit1, n_workers=1)
+print(table.drop(columns="sites").to_string(index=False))
 print("\n")
 
-print("----------------Preferences 2,3,5----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref2+pref5+pref3:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
-
-ListVisit2_3_5 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit2_3_5!=ListVisit1)
-print("\n")
-
-print("----------------Preferences 2,3,4,5----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref2+pref5+pref3+pref4:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
-ListVisit2_3_4_5 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit2_3_4_5!=ListVisit1)
-print("\n")
-
-print("----------------Preferences 1,2,4,5----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref2+pref5+pref1+pref4:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
-
-ListVisit1_2_4_5 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit1_2_4_5!=ListVisit1)
-print("\n")
-
-print("----------------Preferences 1,2,3,4,5----------------")
-prob = create_InitState()
-
-# The preference
-for constr in pref1+pref2+pref3+pref4+pref5:
-    prob += constr 
-
-prob.solve(PULP_CBC_CMD(msg=False))
-print("Status: ",LpStatus[prob.status])
+print("-------------Pareto front of the plans-------------")
 
-ListVisit1_2_3_4_5 = calculate_variables(prices, durations, prob)
-print("Different from ListVisit1: ", ListVisit1_2_3_4_5!=ListVisit1)
+# the plans that can't be improved on the number of sites, the appreciation,
+# the money or the time without being worse on another one
+front = pareto_front(durations, prices, appreciations, max_time=12, budget=65)
+print(front.drop(columns="sites").to_string(index=False))
+print("Problems solved: ", front.attrs['solved'])
 print("\n")
 
 print("-------------------Section 3-------------------")
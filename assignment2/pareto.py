@@ -0,0 +1,232 @@
+"""pareto - the plans of visit that are best for the number of sites, the appreciation,
+the money and the time together (Pareto front), by epsilon-constraint, or approximated
+on a grid of bounds or by weighted sums"""
+from itertools import product
+
+import numpy as np
+from pulp import LpMaximize, LpProblem, LpStatus, lpSum
+
+from itinerary import visit_variables
+from solvers import default_solver
+
+OBJECTIVES = ('visited', 'appreciation', 'money', 'time')
+
+
+class _VisitObjectives:
+    """the expressions of the four objectives over the variables of the sites, built once"""
+
+    def __init__(self, durations, prices, appreciations, max_time, budget):
+        self.durations, self.prices, self.appreciations = durations, prices, appreciations
+        self.max_time, self.budget = max_time, budget
+        self.visits = visit_variables(durations)
+        x = self.visits
+        self.visited = lpSum(x.values())
+        self.appreciation = lpSum(appreciations[site] * x[site] for site in x)
+        self.money = lpSum(prices[site] * x[site] for site in x if prices[site])
+        self.time = lpSum(durations[site] * x[site] for site in x)
+        # the largest value of each objective, to put them on the same scale
+        self.ranges = {
+            'visited': len(x),
+            'appreciation': sum(max(a, 0) for a in appreciations.values()) or 1,
+            'money': budget or 1,
+            'time': max_time or 1}
+
+    def problem(self, objective, visited=0, money=None, time=None):
+        """max objective s.t. at least visited sites, at most money and time (the budget and max_time if None)"""
+        prob = LpProblem("Visiting_Paris_Pareto", LpMaximize)
+        prob += objective
+        prob += self.time <= (self.max_time if time is None else time), "time"
+        prob += self.money <= (self.budget if money is None else money), "money"
+        if visited:
+            prob += self.visited >= visited, "visited"
+        return prob
+
+    def result(self, prob):
+        """the plan of the solution of prob, None if there is none"""
+        if LpStatus[prob.status] != 'Optimal':
+            return None
+        sites = sorted(site for site, x in self.visits.items() if x.varValue == 1)
+        return {
+            'visited': len(sites),
+            'appreciation': sum(self.appreciations[site] for site in sites),
+            'money': sum(self.prices[site] for site in sites),
+            'time': sum(self.durations[site] for site in sites),
+            'sites': sites}
+
+
+def _dominates(a, b):
+    """a is at least as good as b for every objective and better for one"""
+    at_least = (a['visited'] >= b['visited'] and a['appreciation'] >= b['appreciation']
+                and a['money'] <= b['money'] and a['time'] <= b['time'])
+    return at_least and any(a[k] != b[k] for k in OBJECTIVES)
+
+
+def nondominated(plans):
+    """the plans not dominated by another one, without duplicates"""
+    unique = list({tuple(plan['sites']): plan for plan in plans}.values())
+    return [plan for plan in unique if not any(_dominates(other, plan) for other in unique)]
+
+
+# the bounds of money and time are set to this much below the value of a plan found,
+# values closer than that are taken as equal
+TOLERANCE = 1e-4
+
+
+class _BoundedPlans:
+    """the plans of _lexicographic for bounds at most money, at most time, at least visited sites,
+    kept to be reused: the plan of looser bounds that fits tighter ones is also the best one there
+    (and if looser bounds are infeasible so are tighter ones), so it's not solved again"""
+
+    def __init__(self, objectives, solver):
+        self.objectives = objectives
+        self.solver = solver
+        # (money, time, visited, plan or None if infeasible)
+        self.solved = []
+
+    def plan(self, money, time, visited):
+        for m, t, v, plan in reversed(self.solved):
+            if m >= money and t >= time and v <= visited:
+                if plan is None:
+                    return None
+                if plan['money'] <= money and plan['time'] <= time and plan['visited'] >= visited:
+                    return plan
+        plan = _lexicographic(self.objectives, visited, money, time, self.solver)
+        self.solved.append((money, time, visited, plan))
+        return plan
+
+
+def _epsilon_front(objectives, solver):
+    """
+    epsilon-constraint: the best appreciation, then among those plans the best of the other
+    objectives (so that the plans are not dominated), with at most money, at most time and at least
+    a number of sites. For each bound of money, for each bound of time, the number of sites goes up
+    from 0 to one more than the plan found until there is no plan; then the bound of time goes
+    just below the most time of the plans found until there is no plan, and the same for money.
+    Every plan of the Pareto front is found (one per values of the objectives)
+    """
+    plans = _BoundedPlans(objectives, solver)
+    found, money = [], objectives.budget
+    while True:
+        level = _sweep_time(plans, money)
+        if not level:
+            return found, len(plans.solved)
+        found += level
+        money = max(plan['money'] for plan in level) - TOLERANCE
+
+
+def _sweep_time(plans, money):
+    """the plans of _sweep_visited for at most money, tightening the bound of time"""
+    found, time = [], plans.objectives.max_time
+    while True:
+        level = _sweep_visited(plans, money, time)
+        if not level:
+            return found
+        found += level
+        time = max(plan['time'] for plan in level) - TOLERANCE
+
+
+def _sweep_visited(plans, money, time):
+    """the plans for at most money and time, raising the number of sites"""
+    found, visited = [], 0
+    while True:
+        plan = plans.plan(money, time, visited)
+        if plan is None:
+            return found
+        found.append(plan)
+        visited = plan['visited'] + 1
+
+
+def _grid_front(objectives, steps, solver):
+    """
+    approximation of the front for the problems where it has too many plans (e.g. 100 sites and more):
+    the plans of _lexicographic for a grid of steps bounds of money, of time and of the number of sites,
+    only the plans that are the best for a point of the grid are found.
+    The plans of the grid points are reused like in _epsilon_front
+    """
+    # the most sites that can be visited: the last level of the number of sites
+    most = objectives.result(_solve(objectives.problem(objectives.visited), solver))
+    most_visited = most['visited'] if most else 0
+    plans = _BoundedPlans(objectives, solver)
+    found = [plans.plan(money, time, visited)
+             for money in np.linspace(objectives.budget, 0, steps)
+             for time in np.linspace(objectives.max_time, 0, steps)
+             for visited in np.unique(np.linspace(0, most_visited, steps).round().astype(int))]
+    return [plan for plan in found if plan is not None], len(plans.solved) + 1
+
+
+def _lexicographic(objectives, visited, money, time, solver):
+    """the plan with the best appreciation within the bounds, and among them the best
+    for the other objectives (on the same scale). Two problems instead of one objective
+    appreciation + a small part of the others: the solver would have to prove the
+    optimality of these small parts, which takes much longer"""
+    best = objectives.result(_solve(objectives.problem(objectives.appreciation, visited, money, time), solver))
+    if best is None:
+        return None
+    r = objectives.ranges
+    others = objectives.visited / r['visited'] - objectives.money / r['money'] - objectives.time / r['time']
+    prob = objectives.problem(others, visited, money, time)
+    prob += objectives.appreciation >= best['appreciation'] - 1e-6, "appreciation"
+    return objectives.result(_solve(prob, solver)) or best
+
+
+def _weighted_front(objectives, steps, solver):
+    """weighted sums of the four objectives (on the same scale), for the weights on a grid
+    of steps - 1 divisions of the simplex"""
+    r = objectives.ranges
+    terms = {
+        'visited': objectives.visited / r['visited'],
+        'appreciation': objectives.appreciation / r['appreciation'],
+        'money': -1 * objectives.money / r['money'],
+        'time': -1 * objectives.time / r['time']}
+    divisions = max(steps - 1, 1)
+    plans = []
+    n_solved = 0
+    for weights in product(range(divisions + 1), repeat=len(OBJECTIVES)):
+        if sum(weights) != divisions:
+            continue
+        objective = lpSum(w / divisions * terms[name] for w, name in zip(weights, OBJECTIVES) if w)
+        plan = objectives.result(_solve(objectives.problem(objective), solver))
+        n_solved += 1
+        if plan is not None:
+            plans.append(plan)
+    return plans, n_solved
+
+
+def _solve(prob, solver):
+    prob.solve(solver)
+    return prob
+
+
+def pareto_front(durations, prices, appreciations, max_time=12, budget=65, steps=6, method='epsilon', solver=None):
+    """
+    the Pareto front of the plans of visit for: the number of sites (more is better), the appreciation
+    (sum of the appreciations of the sites, more is better), the money and the time spent (less is better),
+    within max_time and budget
+
+    method - 'epsilon': epsilon-constraint, every plan of the front is found, the number of problems solved
+    grows with the size of the front; approximations for the large problems: 'grid': epsilon-constraint on
+    a grid of steps bounds per objective, 'weighted': weighted sums on a grid of steps weights per objective,
+    only plans on the convex hull of the front
+    solver - the pulp solver, default_solver() if not given
+
+    returns a pandas DataFrame with a row per plan: visited, appreciation, money, time, sites,
+    and the number of problems solved in df.attrs['solved']
+    """
+    import pandas as pd
+
+    objectives = _VisitObjectives(durations, prices, appreciations, max_time, budget)
+    solver = solver or default_solver()
+    if method == 'epsilon':
+        plans, n_solved = _epsilon_front(objectives, solver)
+    elif method == 'grid':
+        plans, n_solved = _grid_front(objectives, steps, solver)
+    elif method == 'weighted':
+        plans, n_solved = _weighted_front(objectives, steps, solver)
+    else:
+        raise ValueError(f"method should be 'epsilon', 'grid' or 'weighted', got {method!r}")
+
+    front = pd.DataFrame(nondominated(plans), columns=list(OBJECTIVES) + ['sites'])
+    front = front.sort_values(['appreciation', 'visited'], ascending=False, ignore_index=True)
+    front['sites'] = front['sites'].map(', '.join)
+    front.attrs['solved'] = n_solved
+    return front
@@ -0,0 +1,154 @@
+"""solvers - the solvers of the itinerary problems: every plan of the small 0-1 problems checked
+at once in this process, CBC in a subprocess through pulp for the others, or HiGHS in this
+process through scipy"""
+import numpy as np
+from pulp import (PULP_CBC_CMD, LpInteger, LpMaximize, LpSolver, LpStatusInfeasible, LpStatusNotSolved,
+                  LpStatusOptimal, LpStatusUndefined, LpStatusUnbounded)
+
+# scipy.optimize.milp status: pulp status
+_MILP_STATUS = {
+    0: LpStatusOptimal,
+    1: LpStatusNotSolved, # time or iteration limit
+    2: LpStatusInfeasible,
+    3: LpStatusUnbounded,
+    4: LpStatusUndefined}
+
+
+def _constraints(prob):
+    """the constraints of prob: a dict before PuLP 3.3, a list from prob.constraints() after"""
+    constraints = prob.constraints
+    return list(constraints()) if callable(constraints) else list(constraints.values())
+
+
+def matrix_form(prob, mip=True):
+    """
+    the problem as arrays for scipy.optimize.milp: minimize c @ x s.t. lb <= A @ x <= ub
+    returns variables, c, A (sparse), lb, ub, bounds (lower, upper), integrality
+    """
+    from scipy import sparse
+
+    variables = prob.variables()
+    index = {v.name: i for i, v in enumerate(variables)}
+
+    c = np.zeros(len(variables))
+    for v, coefficient in (prob.objective or {}).items():
+        c[index[v.name]] = coefficient
+    if prob.sense == LpMaximize:
+        c = -c
+
+    rows, cols, values, lb, ub = [], [], [], [], []
+    for constraint in _constraints(prob):
+        # sum(a * x) + constant <= / == / >= 0
+        row = len(lb)
+        for v, coefficient in constraint.items():
+            rows.append(row)
+            cols.append(index[v.name])
+            values.append(coefficient)
+        rhs = -constraint.constant
+        lb.append(rhs if constraint.sense >= 0 else -np.inf)
+        ub.append(rhs if constraint.sense <= 0 else np.inf)
+    A = sparse.csr_matrix((values, (rows, cols)), shape=(len(lb), len(variables)))
+
+    lower = np.array([-np.inf if v.lowBound is None else v.lowBound for v in variables], dtype=float)
+    upper = np.array([np.inf if v.upBound is None else v.upBound for v in variables], dtype=float)
+    integrality = np.array([int(mip and v.cat == LpInteger) for v in variables])
+    return variables, c, A, np.array(lb, dtype=float), np.array(ub, dtype=float), (lower, upper), integrality
+
+
+class SCIPY_MILP(LpSolver):
+    """
+    pulp solver running HiGHS in this process with scipy.optimize.milp:
+    no model file is written and no solver process is started, which is most of the time
+    of the small itinerary problems with CBC. Use it like the other pulp solvers:
+    prob.solve(SCIPY_MILP()) then LpStatus[prob.status], v.varValue, value(prob.objective)
+    """
+
+    name = 'SCIPY_MILP'
+
+    def available(self):
+        try:
+            from scipy.optimize import milp # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def actualSolve(self, lp, **kwargs):
+        from scipy.optimize import Bounds, LinearConstraint, milp
+
+        variables, c, A, lb, ub, (lower, upper), integrality = matrix_form(lp, self.mip)
+        options = {'disp': bool(self.msg)}
+        if self.timeLimit is not None:
+            options['time_limit'] = self.timeLimit
+        constraints = LinearConstraint(A, lb, ub) if A.shape[0] else None
+        result = milp(c, constraints=constraints, integrality=integrality,
+                      bounds=Bounds(lower, upper), options=options)
+
+        if result.x is not None:
+            x = np.where(integrality == 1, np.round(result.x), result.x)
+            lp.assignVarsVals({v.name: float(value) for v, value in zip(variables, x)})
+        status = _MILP_STATUS.get(result.status, LpStatusUndefined)
+        lp.assignStatus(status)
+        return status
+
+
+class BINARY_ENUMERATION(LpSolver):
+    """
+    pulp solver for the small problems with 0-1 variables only, like the visit of the 13 sites of
+    Paris: the 2**n plans are checked at once with a matrix product, in this process, which takes
+    less than a millisecond. The problems with more than max_variables variables (or other than 0-1)
+    are solved by fallback, CBC with warm start if not given.
+    When several plans are optimal the first one enumerated is returned, which can be another
+    one than the plan of CBC
+    """
+
+    name = 'BINARY_ENUMERATION'
+
+    def __init__(self, max_variables=14, fallback=None, block_size=4096, **kwargs):
+        super().__init__(**kwargs)
+        self.max_variables = max_variables
+        self.fallback = fallback or PULP_CBC_CMD(msg=self.msg, warmStart=True)
+        self.block_size = block_size
+
+    def available(self):
+        return True
+
+    def enumerable(self, lp):
+        """whether lp is solved by enumeration: few variables, all of them 0-1"""
+        variables = lp.variables()
+        return len(variables) <= self.max_variables and all(
+            v.cat == LpInteger and v.lowBound == 0 and v.upBound == 1 for v in variables)
+
+    def actualSolve(self, lp, **kwargs):
+        if not self.enumerable(lp):
+            return self.fallback.actualSolve(lp, **kwargs)
+
+        variables, c, A, lb, ub, _, _ = matrix_form(lp)
+        A = A.toarray()
+        n = len(variables)
+        bits = np.arange(n)
+        best, best_value = None, np.inf
+        for m0 in range(0, 2 ** n, self.block_size):
+            plans = (np.arange(m0, min(m0 + self.block_size, 2 ** n))[:, None] >> bits) & 1
+            activity = plans @ A.T
+            feasible = ((activity >= lb - 1e-9) & (activity <= ub + 1e-9)).all(axis=1)
+            if not feasible.any():
+                continue
+            values = np.where(feasible, plans @ c, np.inf)
+            k = int(values.argmin())
+            # strictly better only: the first optimal plan is kept
+            if values[k] < best_value - 1e-9:
+                best, best_value = plans[k], values[k]
+
+        if best is None:
+            lp.assignStatus(LpStatusInfeasible)
+            return LpStatusInfeasible
+        lp.assignVarsVals({v.name: float(value) for v, value in zip(variables, best)})
+        lp.assignStatus(LpStatusOptimal)
+        return LpStatusOptimal
+
+
+def default_solver(msg=False):
+    """enumeration of the plans for the small problems, CBC (pulp's own solver) with warm start
+    for the others. SCIPY_MILP is not the default: on the small problems HiGHS's setup takes
+    longer than starting CBC, and it doesn't start from the previous solution"""
+    return BINARY_ENUMERATION(msg=msg)
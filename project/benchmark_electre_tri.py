@@ -0,0 +1,125 @@
+"""Benchmark of the ELECTRE TRI sorters on synthetic products
+
+run as python benchmark_electre_tri.py [--sizes 1000 100000 ...] [--output results.json]
+the results (time per stage, throughput, peak memory) are written as json
+so that the runs of different commits can be compared"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from classifier import ElectreTriClassifier
+from electre_tri import (CLASSES, DEFAULT_COLUMNS, OptimisticmajoritySorting, PessimisticmajoritySorting,
+                         electre_tri, generate_thresholds)
+from electre_tri_b import electre_tri_b
+from profiles import learn_profiles
+
+def synthetic_products(n_rows, seed=0):
+    """Products with the same seven criteria as ourData.csv and a grade
+    that depends on them, so that every class is present"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'energy_100g': rng.gamma(2.0, 350.0, n_rows),
+        'saturated-fat_100g': rng.gamma(1.0, 3.0, n_rows),
+        'sugars_100g': rng.gamma(1.0, 8.0, n_rows),
+        'fiber_100g': rng.gamma(1.5, 1.2, n_rows),
+        'proteins_100g': rng.gamma(2.0, 3.0, n_rows),
+        'salt_100g': rng.gamma(1.5, 0.4, n_rows),
+        'fruits-vegetables-nuts_100g': rng.uniform(0, 100, n_rows),
+    })
+    # a nutriscore-like score: the negative criteria minus the positive ones
+    score = (df['energy_100g'] / 335 + df['saturated-fat_100g'] + df['sugars_100g'] / 4.5 + df['salt_100g'] / 0.225
+             - df['fiber_100g'] / 0.9 - df['proteins_100g'] / 1.6 - df['fruits-vegetables-nuts_100g'] / 20)
+    score += rng.normal(0, 2, n_rows)
+    grades = np.searchsorted(np.quantile(score, [0.2, 0.4, 0.6, 0.8]), score)
+    df['nutriscore_grade'] = np.array(CLASSES)[grades]
+    return df
+
+def _variants(n_workers):
+    """name: function of (df, thresholds) doing the assignment only"""
+    lmds = [0.5, 0.6, 0.7]
+    return {
+        'pessimistic': lambda df, th: PessimisticmajoritySorting(df, 0.6, thresholds=th, output='codes'),
+        'optimistic': lambda df, th: OptimisticmajoritySorting(df, 0.6, thresholds=th, output='codes'),
+        'sweep_3_lmds': lambda df, th: electre_tri(df, lmds, thresholds=th),
+        f'sweep_3_lmds_{n_workers}_workers': lambda df, th: electre_tri(df, lmds, thresholds=th, n_workers=n_workers),
+        'electre_tri_b_veto': lambda df, th: electre_tri_b(
+            df, 0.6, indifference={'energy_100g': 20}, preference={'energy_100g': 100},
+            veto={'energy_100g': 800}, thresholds=th),
+        'classifier_predict': lambda df, th: ElectreTriClassifier(0.6, thresholds=th).fit(df).predict_codes(df),
+    }
+
+def _learners():
+    """name: function of df learning the thresholds"""
+    return {
+        'generate_thresholds': lambda df: generate_thresholds(df, DEFAULT_COLUMNS),
+        'learn_profiles_mean': lambda df: learn_profiles(df, method='mean'),
+        'learn_profiles_youden': lambda df: learn_profiles(df, method='youden'),
+    }
+
+def measure(function, repeat):
+    """Best wall time of repeat runs and the peak of the memory allocated by one more run
+    (in this process only, the workers of the parallel sweep are not counted)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak, result
+
+def run_benchmark(sizes, repeat=3, n_workers=2, seed=0):
+    """Time and memory of each learner and sorter variant for each number of rows"""
+    results = []
+    for n_rows in sizes:
+        df = synthetic_products(n_rows, seed)
+        thresholds = None
+        for stage, functions in (('learning', _learners()), ('assignment', _variants(n_workers))):
+            for variant, function in functions.items():
+                if stage == 'learning':
+                    seconds, peak, learned = measure(lambda: function(df), repeat)
+                    # the legacy thresholds are the ones the sorters are measured with
+                    if thresholds is None:
+                        thresholds = learned
+                else:
+                    seconds, peak, _ = measure(lambda: function(df, thresholds), repeat)
+                results.append({
+                    'rows': n_rows, 'stage': stage, 'variant': variant,
+                    'seconds': seconds, 'rows_per_second': n_rows / seconds if seconds else None,
+                    'peak_memory_bytes': peak})
+                print(f"{n_rows:>10} {stage:<10} {variant:<28} {seconds:10.4f}s {peak / 2**20:10.1f}MiB")
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10**3, 10**4, 10**5, 10**6],
+                        help='numbers of products, up to 10**7')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per measure, the best one is kept')
+    parser.add_argument('--workers', type=int, default=2, help='processes of the parallel sweep')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_electre_tri.json')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.repeat, args.workers, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'results': results}, f, indent=2)
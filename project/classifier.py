@@ -0,0 +1,86 @@
+import numpy as np
+
+from electre_tri import (CLASSES, DEFAULT_COLUMNS, DEFAULT_WEIGHTS, concordance_matrix, generate_thresholds,
+                         lower_is_better, optimistic_codes, pessimistic_codes)
+
+class ElectreTriClassifier:
+    """
+    Majority sorting with frozen borders, criteria directions, weights and lmd,
+    for grading products without relearning the thresholds every time.
+    The fitted object only holds plain arrays and tuples, so it can be pickled.
+
+    lmd - proportion of weights that a datapoint should be pass to go over the border
+    procedure - 'pessimistic' or 'optimistic', same rules as the sorting functions
+    thresholds - precomputed borders, learned by fit if not given
+    """
+
+    def __init__(self, lmd=0.5, weights=None, columns = DEFAULT_COLUMNS, procedure='pessimistic', thresholds=None):
+        if procedure not in ('pessimistic', 'optimistic'):
+            raise ValueError(f"procedure should be 'pessimistic' or 'optimistic', got {procedure!r}")
+        self.lmd = lmd
+        self.weights = DEFAULT_WEIGHTS if weights is None else weights
+        self.columns = list(columns)
+        self.procedure = procedure
+        self.thresholds = thresholds
+
+    def fit(self, df):
+        """Learn the borders from df (unless given) and freeze everything into arrays"""
+        if self.thresholds is None:
+            self.thresholds = generate_thresholds(df, self.columns)
+        optimistic = self.procedure == 'optimistic'
+
+        self.criteria_ = list(self.thresholds.keys())
+        self.profiles_ = np.array([self.thresholds[criterion] for criterion in self.criteria_], dtype=float).T
+        # a border per class learned, fewer than CLASSES when a grade is missing from the data
+        self.n_classes_ = len(self.profiles_)
+        self.lower_better_ = lower_is_better(self.thresholds, self.criteria_, optimistic=optimistic)
+        self.weights_ = np.array([self.weights[criterion] for criterion in self.criteria_], dtype=float)
+        self.weights_sum_ = sum(self.weights.values())
+
+        # for predict_one: the values where 'higher is better' are negated,
+        # so that 'at least as good as the border' is always value <= border
+        signs = np.where(self.lower_better_, 1.0, -1.0)
+        self.signs_ = tuple(float(sign) for sign in signs)
+        if optimistic:
+            # from the worst border up, the best one is never compared
+            border_order = range(len(self.profiles_) - 1, 0, -1)
+        else:
+            # from the best border down, the worst one is never compared
+            border_order = range(len(self.profiles_) - 1)
+        self.borders_ = tuple(
+            tuple(zip((float(v) for v in self.profiles_[b] * signs), (float(w) for w in self.weights_)))
+            for b in border_order)
+        return self
+
+    def predict_codes(self, df):
+        """int8 class codes (indexes in CLASSES) of all the products in df"""
+        values = df[self.criteria_].to_numpy(dtype=float)
+        concordance = concordance_matrix(values, self.profiles_, self.lower_better_, self.weights_, self.weights_sum_)
+        if self.procedure == 'optimistic':
+            return optimistic_codes(concordance, self.lmd)
+        return pessimistic_codes(concordance, self.lmd)
+
+    def predict(self, df):
+        """Class labels of all the products in df"""
+        return np.array(CLASSES)[self.predict_codes(df)]
+
+    def predict_one(self, product):
+        """Class label of one product given as a dict (or any mapping) of criterion: value"""
+        values = [product[criterion] * sign for criterion, sign in zip(self.criteria_, self.signs_)]
+        lmd, weights_sum = self.lmd, self.weights_sum_
+
+        for border_idx, border in enumerate(self.borders_):
+            over_border_value = 0
+            for value, (border_value, weight) in zip(values, border):
+                if value <= border_value:
+                    over_border_value += weight
+            passed = over_border_value / weights_sum >= lmd
+
+            if self.procedure == 'pessimistic':
+                if passed:
+                    return CLASSES[border_idx]
+            elif not passed:
+                return CLASSES[self.n_classes_ - 1 - border_idx]
+
+        # no more borders
+        return CLASSES[self.n_classes_ - 1] if self.procedure == 'pessimistic' else CLASSES[0]
@@ -1,7 +1,7 @@
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import roc_curve, auc
 
 import numpy as np
+import pandas as pd
 
 # Function to find optimal threshold using ROC analysis
 def find_optimal_threshold(data, labels):
@@ -12,19 +12,11 @@ def find_optimal_threshold(data, labels):
     # Split the data into train and test sets
     X_train, _, y_train, _ = train_test_split(data, y_true, test_size=0.01, random_state=42)
 
-    # Compute ROC curve and AUC for each class
-    fpr = dict()
-    tpr = dict()
-    roc_auc = dict()
-
-    for i in range(len(np.unique(y_true))):
-        y_true_i = (y_true == i).astype(int)
-        fpr[i], tpr[i], _ = roc_curve(y_true_i, data)
-        roc_auc[i] = auc(fpr[i], tpr[i])
-
-    # Find the threshold that maximizes the sum of sensitivity and specificity
-    optimal_thresholds = np.zeros(len(np.unique(y_true)))
-    for i in range(len(np.unique(y_true))):
+    # The borders are the means of the classes,
+    # see profiles.learn_profiles for ROC-optimal ones
+    n_classes = len(np.unique(y_true))
+    optimal_thresholds = np.zeros(n_classes)
+    for i in range(n_classes):
         optimal_thresholds[i] = X_train[y_train == i].mean()
 
     return optimal_thresholds
@@ -46,7 +38,11 @@ def generate_thresholds(
         # Find optimal thresholds
         optimal_threshold = find_optimal_threshold(data, labels)
         thresholds[column] = optimal_threshold
-    
+
+    return order_borders(thresholds, columns)
+
+def order_borders(thresholds, columns):
+    """Round the borders and sort them from the best value to the worst one"""
     ## Sort the borders either in descending or ascending order
     for key, value in thresholds.items():
         value = [round(v, 2) for v in value]
@@ -63,183 +59,286 @@ def generate_thresholds(
 
     return thresholds
 
-def PessimisticmajoritySorting(df, lmd, columns = ['energy_100g', 'saturated-fat_100g', 'sugars_100g', 'fiber_100g',
-            'proteins_100g', 'salt_100g', 'fruits-vegetables-nuts_100g'], results_col_1 = 'pessim_electre_lmd=',
-            debug=False, weights=None):
+# Classes from the best to the worst, the code of a class is its position
+CLASSES = ['a', 'b', 'c', 'd', 'e']
+
+DEFAULT_COLUMNS = ['energy_100g', 'saturated-fat_100g', 'sugars_100g', 'fiber_100g',
+            'proteins_100g', 'salt_100g', 'fruits-vegetables-nuts_100g']
+
+DEFAULT_WEIGHTS = {
+    "energy_100g":1, "sugars_100g":1, "saturated-fat_100g":1, "salt_100g": 1, 
+    "proteins_100g":2, "fiber_100g": 2, "fruits-vegetables-nuts_100g":2}
+
+def lower_is_better(thresholds, criteria, optimistic=False):
+    """For each criterion, whether the lower value is the better one.
+    Decided from the order of the borders the same way both sortings always did:
+    the pessimistic one treats equal first and last borders as 'lower is better',
+    the optimistic one (that walks the reversed borders) as 'higher is better'"""
+    lower_better = []
+    for criterion in criteria:
+        first, last = thresholds[criterion][0], thresholds[criterion][-1]
+        if optimistic:
+            lower_better.append(bool(last > first))
+        else:
+            lower_better.append(not first > last)
+    return np.array(lower_better)
+
+def _is_better(product_value, border_value, lower_better):
+    """Whether the product is at least as good as the border on one criterion"""
+    if lower_better:
+        return product_value <= border_value
+    return product_value >= border_value
+
+def concordance_matrix(values, profiles, lower_better, weights, weights_sum):
+    """
+    values - (products x criteria) array of the products
+    profiles - (borders x criteria) array of the borders, from the best to the worst
+    lower_better - per criterion, whether the lower value is the better one
+    weights - per criterion weights, weights_sum - the total weight to divide by
+
+    returns (products x borders) array with the proportion of weights for which
+    the product is at least as good as the border
+    """
+    values = np.asarray(values, dtype=float)
+    profiles = np.asarray(profiles, dtype=float)
+
+    over_border_value = np.zeros((values.shape[0], profiles.shape[0]))
+    # one broadcasted comparison per criterion, summed in the criteria order
+    for j in range(values.shape[1]):
+        better = _is_better(values[:, j, None], profiles[None, :, j], lower_better[j])
+        over_border_value += better * weights[j]
+
+    return over_border_value / weights_sum
+
+def outranking_masks(values, profiles, lower_better):
+    """(criteria x products x borders) boolean array, True where the product
+    is at least as good as the border on the criterion.
+    Computed once, it gives the concordance for any weights with weighted_concordance"""
+    values = np.asarray(values, dtype=float)
+    profiles = np.asarray(profiles, dtype=float)
+    return np.stack([
+        _is_better(values[:, j, None], profiles[None, :, j], lower_better[j])
+        for j in range(values.shape[1])])
+
+def weighted_concordance(masks, weights, weights_sum):
+    """Same result as concordance_matrix, from the precomputed outranking_masks"""
+    over_border_value = np.zeros(masks.shape[1:])
+    for j in range(masks.shape[0]):
+        over_border_value += masks[j] * weights[j]
+    return over_border_value / weights_sum
+
+def _codes_out(n_products, out):
+    """The int8 array to write class codes to, out if given"""
+    if out is None:
+        return np.empty(n_products, dtype=np.int8)
+    if out.shape != (n_products,) or out.dtype != np.int8:
+        raise ValueError(f"out should be an int8 array of shape ({n_products},), got {out.dtype} {out.shape}")
+    return out
+
+def pessimistic_codes(concordance, lmd, out=None):
+    """Index of the class of every product with the pessimistic rule:
+    the first border (from the best) the product outranks, the last class otherwise.
+    out - int8 array to write the codes to instead of a new one"""
+    n_classes = concordance.shape[1]
+    codes = _codes_out(concordance.shape[0], out)
+    # the last border is never compared, no class below it
+    passed = concordance[:, :-1] >= lmd
+    np.copyto(codes, np.where(passed.any(axis=1), passed.argmax(axis=1), n_classes - 1), casting='unsafe')
+    return codes
+
+def optimistic_codes(concordance, lmd, out=None):
+    """Index of the class of every product with the optimistic rule:
+    going up from the worst border, the class of the first border the product doesn't outrank,
+    the best class otherwise.
+    out - int8 array to write the codes to instead of a new one"""
+    n_classes = concordance.shape[1]
+    codes = _codes_out(concordance.shape[0], out)
+    # borders from the worst to the best, the best one is never compared
+    failed = concordance[:, :0:-1] < lmd
+    np.copyto(codes, np.where(failed.any(axis=1), n_classes - 1 - failed.argmax(axis=1), 0), casting='unsafe')
+    return codes
+
+def _sorting_inputs(df, weights, thresholds, optimistic):
+    """Arrays needed by the sorting: values, profiles, criteria directions and weights"""
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    weights_sum = sum(weights.values())
+
+    criteria = list(thresholds.keys())
+    values = df[criteria].to_numpy(dtype=float)
+    profiles = np.array([thresholds[criterion] for criterion in criteria], dtype=float).T
+    lower_better = lower_is_better(thresholds, criteria, optimistic=optimistic)
+    weights_np = np.array([weights[criterion] for criterion in criteria], dtype=float)
+    return criteria, values, profiles, lower_better, weights_np, weights_sum
+
+def _print_first_product(criteria, values, profiles, lower_better, concordance, border_order, chosen_class):
+    """Debug output: the comparisons of the first product with the borders"""
+    for border_idx in border_order:
+        for j, criterion in enumerate(criteria):
+            product_value, border_value = values[0, j], profiles[border_idx, j]
+            print('criterion: ', criterion, product_value, border_value)
+            if (product_value <= border_value) if lower_better[j] else (product_value >= border_value):
+                print(criterion, 'better')
+        print("weight", concordance[0, border_idx])
+        print("____Done with this border \n")
+    print(chosen_class)
+    print("________________________________________")
+
+def _sorting_result(df, results_col, codes, output):
+    """What the sorting functions return for the given output mode"""
+    if output == 'frame':
+        df[results_col] = np.array(CLASSES)[codes]
+        return df
+    if output == 'codes':
+        return codes
+    if output == 'categorical':
+        return pd.Categorical.from_codes(codes, CLASSES)
+    raise ValueError(f"output should be 'frame', 'codes' or 'categorical', got {output!r}")
+
+def PessimisticmajoritySorting(df, lmd, columns = DEFAULT_COLUMNS, results_col_1 = 'pessim_electre_lmd=',
+            debug=False, weights=None, thresholds=None, output='frame', out=None):
     """
     lmd - proportion of weights that a datapoint should be pass to go over the border
     results_col_1 - the name of the column to save the results to
+    debug - print the comparisons for the first product only, nothing is returned
+    thresholds - precomputed borders (see generate_thresholds), learned from df if not given
+    output - 'frame': add the results column to df and return df,
+        'codes': return the int8 class codes (indexes in CLASSES), df is not changed,
+        'categorical': return a pd.Categorical of the classes, df is not changed
+    out - preallocated int8 array of len(df) to write the class codes to
     """
     results_col = f'{results_col_1}{lmd}'
-    df[results_col] = ''
-    classes = ['a', 'b', 'c', 'd', 'e']
-    
-    if weights == None:
-        weights = {
-            "energy_100g":1, "sugars_100g":1, "saturated-fat_100g":1, "salt_100g": 1, 
-            "proteins_100g":2, "fiber_100g": 2, "fruits-vegetables-nuts_100g":2}
-        # weights = {
-        #     "Energy":1, "Sugars":1, "Saturated_fatty_acids":1, "Salt": 1, 
-        #     "Proteins":2, "Fiber": 2, "Fruit_vegetable":2}
-    weights_sum = sum(weights.values())
 
-    thresholds = generate_thresholds(df, columns)
+    if thresholds is None:
+        thresholds = generate_thresholds(df, columns)
+    criteria, values, profiles, lower_better, weights_np, weights_sum = _sorting_inputs(
+        df, weights, thresholds, optimistic=False)
 
-    criteria = list(thresholds.keys())
+    concordance = concordance_matrix(values, profiles, lower_better, weights_np, weights_sum)
+    codes = pessimistic_codes(concordance, lmd, out=out)
 
-    # check if criteria are ascending or descending
-    crit_increase = {}
-    for criterion in criteria:
-        if thresholds[criterion][0] > thresholds[criterion][-1]:
-            crit_increase[criterion] = False
-        else:
-            crit_increase[criterion] = True
-
-    data_idx = 0
-
-    for row_idx, _ in df.iterrows():
-        border_idx = 0
-        chose_class = False
-
-        while chose_class == False:
-            # for each next border comparison, initialize over_border_value
-            over_border_value = 0
-            for criterion in criteria:
-                product_value = df.iloc[data_idx][criterion]
-                border_value = thresholds[criterion][border_idx]
-                if debug:
-                    print(product_value, border_value)
-                
-                if crit_increase[criterion] == False:
-                    # the higher the value, the better
-                    if product_value >= border_value:
-                        # the value is better than border
-                        if debug:
-                            print(criterion, 'better 1')
-                        over_border_value += weights[criterion]
-                else:
-                    # the lower the value the better
-                    if product_value <= border_value:
-                        # the value is better than border
-                        if debug: 
-                            print(criterion, 'better 2')
-                        over_border_value += weights[criterion]
-            
-            over_border_perc = over_border_value / weights_sum
-            if debug:
-                print("weight", over_border_perc)
-
-            if over_border_perc >= lmd:
-                # product should stay in the class
-                chose_class = True
-                chosen_class = classes[border_idx]
-            else:
-                # product should go to the lower class
-                border_idx += 1
-                # check if it's not the last border
-                if border_idx + 1 == len(thresholds[criterion]):
-                    # assign the last class because no more borders
-                    chose_class = True
-                    chosen_class = classes[border_idx]
-            if debug:
-                print("____Done with this border \n")
-        
-        if debug:
-            print(chosen_class)
-            print("________________________________________")
-            break
-
-        df.at[row_idx, results_col] = chosen_class
-        data_idx+=1
-    
-    if not debug:
-        return df
+    if debug:
+        _print_first_product(criteria, values, profiles, lower_better, concordance,
+                             range(codes[0] + 1 if codes[0] < len(CLASSES) - 1 else codes[0]),
+                             CLASSES[codes[0]])
+        return
+
+    return _sorting_result(df, results_col, codes, output)
 
-def OptimisticmajoritySorting(df, lmd, columns = ['energy_100g', 'saturated-fat_100g', 'sugars_100g', 'fiber_100g',
-            'proteins_100g', 'salt_100g', 'fruits-vegetables-nuts_100g'], debug=False, weights=None):
+def OptimisticmajoritySorting(df, lmd, columns = DEFAULT_COLUMNS, debug=False, weights=None, thresholds=None,
+            output='frame', out=None):
     """
     lmd - proportion of weights that a datapoint should be pass to go over the border
+    debug - print the comparisons for the first product only, nothing is returned
+    thresholds - precomputed borders (see generate_thresholds), learned from df if not given
+    output, out - see PessimisticmajoritySorting
     """
     results_col = f'optim_electre_lmd={lmd}'
-    df[results_col] = ''
-    classes = ['e', 'd', 'c', 'b', 'a']
 
-    if weights == None:
-        weights = {
-            "energy_100g":1, "sugars_100g":1, "saturated-fat_100g":1, "salt_100g": 1, 
-            "proteins_100g":2, "fiber_100g": 2, "fruits-vegetables-nuts_100g":2}
-    weights_sum = sum(weights.values())
+    if thresholds is None:
+        thresholds = generate_thresholds(df, columns)
+    criteria, values, profiles, lower_better, weights_np, weights_sum = _sorting_inputs(
+        df, weights, thresholds, optimistic=True)
 
-    thresholds = generate_thresholds(df, columns)
-    # threshodls are from the best to the worst
-    # so we need to reverse the order first
-    thresholds_rev = {key: value[::-1] for key, value in thresholds.items()}
+    concordance = concordance_matrix(values, profiles, lower_better, weights_np, weights_sum)
+    codes = optimistic_codes(concordance, lmd, out=out)
 
-    criteria = list(thresholds_rev.keys())
+    if debug:
+        # borders are compared from the worst one up
+        n_compared = len(CLASSES) - codes[0] if codes[0] > 0 else len(CLASSES) - 1
+        _print_first_product(criteria, values, profiles, lower_better, concordance,
+                             range(len(CLASSES) - 1, len(CLASSES) - 1 - n_compared, -1),
+                             CLASSES[codes[0]])
+        return
 
-    # check if criteria are ascending or descending
-    crit_increase = {}
-    for criterion in criteria:
-        if thresholds_rev[criterion][0] > thresholds_rev[criterion][-1]:
-            crit_increase[criterion] = False
-        else:
-            crit_increase[criterion] = True
-
-    data_idx = 0
-
-    for row_idx, _ in df.iterrows():
-        border_idx = 0
-        
-        chose_class = False
-
-        while chose_class == False:
-            # for each next border comparison, initialize over_border_value
-            over_border_value = 0
-            for criterion in criteria:
-                product_value = df.iloc[data_idx][criterion]
-                border_value = thresholds_rev[criterion][border_idx]
-                if debug:
-                    print('criterion: ', criterion, product_value, border_value)
-                
-                if crit_increase[criterion] == True:
-                    # the higher the value, the better
-                    if border_value <= product_value:
-                        # the value is better than border
-                        if debug:
-                            print(criterion, 'better 1')
-                        over_border_value += weights[criterion]
-                else:
-                    # the lower the value the better
-                    if border_value >= product_value:
-                        # the value is better than border
-                        if debug:
-                            print(criterion, 'better 2')
-                        over_border_value += weights[criterion]
-            
-            over_border_perc = over_border_value / weights_sum
-            if debug:
-                print('weight', over_border_perc)
-            if over_border_perc >= lmd:
-                # product should go to a better class
-                border_idx += 1
-                # check if it's not the last border
-                if border_idx + 1 == len(thresholds_rev[criterion]):
-                    # assign the last class because no more borders
-                    chose_class = True
-                    chosen_class = classes[border_idx]
-            else:
-                # product stay in this class
-                chose_class = True
-                chosen_class = classes[border_idx]
-            if debug:
-                print("____Done with this border \n")
-        
-        if debug:
-            print(chosen_class)
-            print("________________________________________")
-            break
-
-        df.at[row_idx, results_col] = chosen_class
-        data_idx+=1
-    if not debug:
-        return df
\ No newline at end of file
+    return _sorting_result(df, results_col, codes, output)
+
+def _sweep_out(shape, out):
+    """The int8 array of shape (2,) + shape to write the sweep codes to, out if given"""
+    shape = (2,) + tuple(shape)
+    if out is None:
+        return np.empty(shape, dtype=np.int8)
+    if out.shape != shape or out.dtype != np.int8:
+        raise ValueError(f"out should be an int8 array of shape {shape}, got {out.dtype} {out.shape}")
+    return out
+
+def sweep_codes(values, profiles, lower_better, weights_arrays, weights_sums, lmds, out=None):
+    """
+    The array part of electre_tri.
+    lower_better - pair of directions arrays for the pessimistic and the optimistic sorting
+    weights_arrays, weights_sums - per criterion weights and their total for each weights dict
+    out - int8 array to write the codes to instead of a new one
+
+    returns int8 array of class codes of shape (2, len(weights_arrays), len(lmds), len(values))
+    """
+    lower_better_pessim, lower_better_optim = lower_better
+    masks_pessim = outranking_masks(values, profiles, lower_better_pessim)
+    # the directions only differ for criteria with equal first and last borders
+    if (lower_better_pessim == lower_better_optim).all():
+        masks_optim = masks_pessim
+    else:
+        masks_optim = outranking_masks(values, profiles, lower_better_optim)
+
+    n_classes = profiles.shape[0]
+    codes = _sweep_out((len(weights_arrays), len(lmds), len(values)), out)
+
+    for w_idx, (weights_np, weights_sum) in enumerate(zip(weights_arrays, weights_sums)):
+        # pessimistic: the class is the number of the borders (from the best) before
+        # the first one with enough concordance, so the running maximum of the
+        # concordance gives it for any lmd by counting the borders below lmd
+        concordance = weighted_concordance(masks_pessim, weights_np, weights_sum)
+        best_so_far = np.maximum.accumulate(concordance[:, :-1], axis=1)
+
+        # optimistic: going up from the worst border, the number of borders passed
+        # before the first failing one, i.e. the running minimum above lmd
+        if masks_optim is not masks_pessim:
+            concordance = weighted_concordance(masks_optim, weights_np, weights_sum)
+        worst_so_far = np.minimum.accumulate(concordance[:, :0:-1], axis=1)
+
+        for l_idx, lmd in enumerate(lmds):
+            codes[0, w_idx, l_idx] = (best_so_far < lmd).sum(axis=1)
+            codes[1, w_idx, l_idx] = n_classes - 1 - (worst_so_far >= lmd).sum(axis=1)
+
+    return codes
+
+def electre_tri(df, lmds, weights_list=None, columns = DEFAULT_COLUMNS, thresholds=None, n_workers=None,
+            out=None):
+    """
+    Pessimistic and optimistic majority sorting for several lmd values and weights at once.
+    The thresholds are learned once and every product is compared with every border once,
+    so each additional lmd only costs a few comparisons per product.
+
+    lmds - list of proportions of weights (see PessimisticmajoritySorting)
+    weights_list - list of weights dicts, [None] (the default weights) if not given
+    thresholds - precomputed borders (see generate_thresholds), learned from df if not given
+    n_workers - if more than 1, the products are split between that many processes
+        (see parallel_sorting), the result is the same
+    out - preallocated int8 array of the returned shape to write the codes to
+
+    returns int8 array of class codes (indexes in CLASSES) of shape
+    (2, len(weights_list), len(lmds), len(df)), the first axis being pessimistic, optimistic.
+    To get the labels, use np.array(CLASSES)[codes] or pd.Categorical.from_codes(codes[i, j, k], CLASSES)
+    """
+    if weights_list is None:
+        weights_list = [None]
+
+    if thresholds is None:
+        thresholds = generate_thresholds(df, columns)
+    criteria = list(thresholds.keys())
+    values = df[criteria].to_numpy(dtype=float)
+    profiles = np.array([thresholds[criterion] for criterion in criteria], dtype=float).T
+    lower_better = (lower_is_better(thresholds, criteria, optimistic=False),
+                    lower_is_better(thresholds, criteria, optimistic=True))
+
+    weights_arrays, weights_sums = [], []
+    for weights in weights_list:
+        if weights is None:
+            weights = DEFAULT_WEIGHTS
+        weights_sums.append(sum(weights.values()))
+        weights_arrays.append(np.array([weights[criterion] for criterion in criteria], dtype=float))
+
+    if n_workers is not None and n_workers > 1:
+        from parallel_sorting import parallel_sweep_codes
+        return parallel_sweep_codes(values, profiles, lower_better, weights_arrays, weights_sums, lmds,
+                                    n_workers=n_workers, out=out)
+    return sweep_codes(values, profiles, lower_better, weights_arrays, weights_sums, lmds, out=out)
@@ -0,0 +1,115 @@
+import numpy as np
+
+from electre_tri import (DEFAULT_COLUMNS, DEFAULT_WEIGHTS, generate_thresholds, lower_is_better,
+                         optimistic_codes, pessimistic_codes)
+
+def _advantages(values, profiles, lower_better, j, reverse):
+    """(products x borders) advantage of the border over the product on criterion j,
+    of the product over the border if reverse"""
+    advantage = profiles[None, :, j] - values[:, j, None]
+    if lower_better[j]:
+        advantage = -advantage
+    return -advantage if reverse else advantage
+
+def _partial_concordance(advantage, q, p):
+    """1 up to the indifference threshold q, 0 from the preference threshold p, linear in between"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(advantage <= q, 1.0, np.where(advantage < p, (p - advantage) / (p - q), 0.0))
+
+def _discordance(advantage, p, v):
+    """0 up to the preference threshold p, 1 from the veto threshold v, linear in between"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(advantage >= v, 1.0, np.where(advantage > p, (advantage - p) / (v - p), 0.0))
+
+def criteria_thresholds(criteria, indifference=None, preference=None, veto=None):
+    """
+    Per criterion arrays of the indifference (q), preference (p) and veto (v) thresholds.
+    Missing criteria get q = 0, p = q and no veto (v = inf), so that without any
+    threshold the relation is the hard comparison of the majority sorting
+    """
+    indifference = indifference or {}
+    preference = preference or {}
+    veto = veto or {}
+
+    q = np.array([indifference.get(criterion, 0.0) for criterion in criteria], dtype=float)
+    p = np.array([preference.get(criterion, q[j]) for j, criterion in enumerate(criteria)], dtype=float)
+    v = np.array([veto.get(criterion, np.inf) for criterion in criteria], dtype=float)
+    v[np.isnan(v)] = np.inf
+
+    if (q < 0).any() or (p < q).any() or (v < p).any():
+        raise ValueError("thresholds should satisfy 0 <= indifference <= preference <= veto for every criterion")
+    return q, p, v
+
+def credibility_matrix(values, profiles, lower_better, weights, weights_sum, q, p, v, reverse=False):
+    """
+    (products x borders) credibility of 'the product outranks the border',
+    of 'the border outranks the product' if reverse.
+    The concordance index is summed in the criteria order like concordance_matrix,
+    then weakened by every criterion whose discordance is above it
+    """
+    values = np.asarray(values, dtype=float)
+    profiles = np.asarray(profiles, dtype=float)
+    n_criteria = values.shape[1]
+
+    concordance = np.zeros((values.shape[0], profiles.shape[0]))
+    for j in range(n_criteria):
+        advantage = _advantages(values, profiles, lower_better, j, reverse)
+        concordance += _partial_concordance(advantage, q[j], p[j]) * weights[j]
+    concordance /= weights_sum
+
+    credibility = concordance.copy()
+    for j in np.flatnonzero(np.isfinite(v)):
+        discordance = _discordance(_advantages(values, profiles, lower_better, j, reverse), p[j], v[j])
+        weakening = discordance > concordance
+        with np.errstate(invalid='ignore', divide='ignore'):
+            factor = np.where(weakening, (1 - discordance) / (1 - concordance), 1.0)
+        credibility *= factor
+
+    return credibility
+
+def electre_tri_b(df, lmd, indifference=None, preference=None, veto=None, columns = DEFAULT_COLUMNS,
+            weights=None, thresholds=None, procedure='pessimistic', strict=False):
+    """
+    ELECTRE TRI-B sorting with indifference, preference and veto thresholds.
+    With no thresholds it gives the same classes as PessimisticmajoritySorting / OptimisticmajoritySorting.
+
+    lmd - the cutting level of the credibility index
+    indifference, preference, veto - dicts of criterion: threshold, in the units of the criterion
+    thresholds - the borders (see generate_thresholds), learned from df if not given
+    procedure - 'pessimistic': from the best border down, the class of the first border the product outranks,
+        'optimistic': from the worst border up, the class of the first border the product doesn't outrank
+    strict - for the optimistic procedure, stop only at a border strictly preferred to the product
+        (the border outranks the product and not the other way round), as in the textbook ELECTRE TRI-B
+
+    returns int8 class codes (indexes in CLASSES)
+    """
+    if procedure not in ('pessimistic', 'optimistic'):
+        raise ValueError(f"procedure should be 'pessimistic' or 'optimistic', got {procedure!r}")
+    optimistic = procedure == 'optimistic'
+
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    if thresholds is None:
+        thresholds = generate_thresholds(df, columns)
+
+    criteria = list(thresholds.keys())
+    values = df[criteria].to_numpy(dtype=float)
+    profiles = np.array([thresholds[criterion] for criterion in criteria], dtype=float).T
+    lower_better = lower_is_better(thresholds, criteria, optimistic=optimistic)
+    weights_np = np.array([weights[criterion] for criterion in criteria], dtype=float)
+    weights_sum = sum(weights.values())
+    q, p, v = criteria_thresholds(criteria, indifference, preference, veto)
+
+    credibility = credibility_matrix(values, profiles, lower_better, weights_np, weights_sum, q, p, v)
+    if not optimistic:
+        return pessimistic_codes(credibility, lmd)
+    if not strict:
+        return optimistic_codes(credibility, lmd)
+
+    reverse_credibility = credibility_matrix(values, profiles, lower_better, weights_np, weights_sum, q, p, v,
+                                             reverse=True)
+    n_classes = profiles.shape[0]
+    # borders from the worst to the best, the best one is never compared
+    preferred = (credibility[:, :0:-1] < lmd) & (reverse_credibility[:, :0:-1] >= lmd)
+    codes = np.where(preferred.any(axis=1), n_classes - 1 - preferred.argmax(axis=1), 0)
+    return codes.astype(np.int8)
@@ -0,0 +1,71 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+
+import numpy as np
+
+from electre_tri import _sweep_out, sweep_codes
+
+# arrays of the worker process, views on the shared memory of the parent
+_shared = {}
+
+def _to_shared(array):
+    """Copy an array to a new shared memory block, returns the block and its description"""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def _attach(name, shape, dtype):
+    """Read-only view on a shared memory block created by the parent"""
+    shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    return shm, array
+
+def _init_worker(values_desc, profiles_desc, lower_better, weights_arrays, weights_sums, lmds):
+    """Attach once per worker to the products and the profiles"""
+    _shared['values_shm'], _shared['values'] = _attach(*values_desc)
+    _shared['profiles_shm'], _shared['profiles'] = _attach(*profiles_desc)
+    _shared['args'] = (lower_better, weights_arrays, weights_sums, lmds)
+
+def _sort_partition(start, stop):
+    lower_better, weights_arrays, weights_sums, lmds = _shared['args']
+    return sweep_codes(_shared['values'][start:stop], _shared['profiles'],
+                       lower_better, weights_arrays, weights_sums, lmds)
+
+def parallel_sweep_codes(values, profiles, lower_better, weights_arrays, weights_sums, lmds,
+            n_workers=None, n_partitions=None, out=None):
+    """
+    Same as electre_tri.sweep_codes, with the products split into n_partitions row ranges
+    sorted in a pool of n_workers processes. The products and the profiles are put once
+    in shared memory instead of being pickled for every partition, and each partition
+    is written back to its own rows, so the result doesn't depend on the scheduling.
+
+    n_workers - the number of processes, os.cpu_count() if not given
+    n_partitions - the number of row ranges, 4 per worker if not given
+    out - int8 array to write the codes to instead of a new one
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    profiles = np.ascontiguousarray(profiles, dtype=float)
+    n_workers = n_workers or os.cpu_count()
+    n_partitions = n_partitions or 4 * n_workers
+    bounds = np.linspace(0, len(values), n_partitions + 1).astype(int)
+
+    codes = _sweep_out((len(weights_arrays), len(lmds), len(values)), out)
+
+    values_shm, values_desc = _to_shared(values)
+    profiles_shm, profiles_desc = _to_shared(profiles)
+    try:
+        with ProcessPoolExecutor(
+                max_workers=n_workers, initializer=_init_worker,
+                initargs=(values_desc, profiles_desc, lower_better, weights_arrays, weights_sums, lmds)) as pool:
+            futures = [(start, stop, pool.submit(_sort_partition, start, stop))
+                       for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+            for start, stop, future in futures:
+                codes[..., start:stop] = future.result()
+    finally:
+        for shm in (values_shm, profiles_shm):
+            shm.close()
+            shm.unlink()
+
+    return codes
@@ -0,0 +1,113 @@
+import numpy as np
+
+from electre_tri import CLASSES, DEFAULT_COLUMNS
+
+def learn_profiles(df, columns = DEFAULT_COLUMNS, label_col='nutriscore_grade', method='mean', classes=CLASSES,
+            procedure='pessimistic'):
+    """
+    Borders of every class for all the criteria at once, in the format of generate_thresholds
+    (one border per class, from the best value to the worst one), so the result can be given as
+    thresholds to the sorting functions.
+    Each criterion is sorted once, the borders come from the cumulative counts of the classes.
+
+    method - 'mean': the mean of the class (on all the rows, generate_thresholds uses a 99% split),
+        'youden': the limits between the classes, the ROC-optimal cut of the classes up to k
+        against the classes below, i.e. the value maximizing sensitivity + specificity - 1
+    classes - the labels from the best class to the worst, the ones without rows get no border
+        (like generate_thresholds), any other label in label_col is an error
+    procedure - for 'youden', the sorting the borders are for: 'pessimistic' gives a class its
+        lower limit as border (the product that outranks it is in the class), 'optimistic' its
+        upper limit (the product that doesn't outrank it is in the class or below). The border
+        the procedure never compares repeats its neighbour
+    """
+    if method not in ('mean', 'youden'):
+        raise ValueError(f"method should be 'mean' or 'youden', got {method!r}")
+    if procedure not in ('pessimistic', 'optimistic'):
+        raise ValueError(f"procedure should be 'pessimistic' or 'optimistic', got {procedure!r}")
+
+    labels = df[label_col]
+    unknown = labels[~labels.isin(classes)].unique()
+    if len(unknown):
+        raise ValueError(f"{label_col} should only contain labels of {list(classes)}, got {list(unknown)}")
+
+    present = [label for label in classes if (labels == label).any()]
+    if len(present) < 2:
+        raise ValueError(f"the borders need at least two classes in {label_col}, got {present}")
+    label_mapping = {label: code for code, label in enumerate(present)}
+    codes = labels.map(label_mapping).to_numpy(dtype=np.int64)
+    values = df[list(columns)].to_numpy(dtype=float)
+
+    # one sort per criterion, the missing values go last and are cut off below
+    order = np.argsort(values, axis=0, kind='stable')
+
+    thresholds = {}
+    for j, column in enumerate(columns):
+        column_order = order[:, j]
+        column_order = column_order[~np.isnan(values[column_order, j])]
+        sorted_values = values[column_order, j]
+        sorted_codes = codes[column_order]
+
+        # the direction of the criterion: the one in which the limits separate the classes best
+        cuts, higher_better = _youden_cuts(sorted_values, sorted_codes, len(present))
+        if method == 'mean':
+            borders = _class_means(sorted_values, sorted_codes, len(present))
+            names = present
+        else:
+            borders = cuts
+            names = [f'{better}/{worse}' for better, worse in zip(present, present[1:])]
+        # the sorting of the borders is undefined with nan
+        missing = [name for name, border in zip(names, borders) if np.isnan(border)]
+        if missing:
+            raise ValueError(f"no border {missing} for {column}: "
+                             "none of the rows (or all the rows) of the classes have a value")
+
+        # from the best value to the worst one, the sorting functions take the direction of the
+        # criterion from the first and last borders
+        borders = sorted((round(float(border), 2) for border in borders), reverse=bool(higher_better))
+        if method == 'youden':
+            borders = borders + borders[-1:] if procedure == 'pessimistic' else borders[:1] + borders
+        thresholds[column] = borders
+
+    return thresholds
+
+def _class_means(sorted_values, sorted_codes, n_classes):
+    """Mean value of each class, nan for the classes without rows"""
+    counts = np.bincount(sorted_codes, minlength=n_classes)
+    sums = np.bincount(sorted_codes, weights=sorted_values, minlength=n_classes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+def _youden_statistics(sorted_values, sorted_codes, n_classes):
+    """For the cuts going down from the highest value, sensitivity + specificity - 1 of
+    'the rows >= cut are in the classes up to k' for the n_classes - 1 limits k/k+1,
+    and the values of the cuts"""
+    # the number of rows of each class above the cut, then of the classes up to k
+    one_hot = np.zeros((len(sorted_codes), n_classes), dtype=np.int64)
+    one_hot[np.arange(len(sorted_codes)), sorted_codes] = 1
+    positives = np.cumsum(np.cumsum(one_hot[::-1], axis=0), axis=1)[:, :-1]
+    negatives = np.arange(1, len(sorted_codes) + 1)[:, None] - positives
+    cut_values = sorted_values[::-1]
+
+    # only cut between different values
+    distinct = np.append(cut_values[1:] != cut_values[:-1], True)
+    positives, negatives, cut_values = positives[distinct], negatives[distinct], cut_values[distinct]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        youden = positives / positives[-1] - negatives / negatives[-1]
+    return youden, cut_values
+
+def _youden_cuts(sorted_values, sorted_codes, n_classes):
+    """The ROC-optimal limits between the classes up to k and the classes below,
+    nan if it's not defined, and whether the higher values are the better ones:
+    the direction in which the limits separate the classes best"""
+    higher, higher_cuts = _youden_statistics(sorted_values, sorted_codes, n_classes)
+    # the same going up from the lowest value, on the negated values
+    lower, lower_cuts = _youden_statistics(-sorted_values[::-1], sorted_codes[::-1], n_classes)
+
+    higher_better = np.nansum(np.nanmax(higher, axis=0, initial=-np.inf)) >= \
+        np.nansum(np.nanmax(lower, axis=0, initial=-np.inf))
+    youden, cut_values = (higher, higher_cuts) if higher_better else (lower, -lower_cuts)
+
+    cuts = cut_values[np.nanargmax(np.nan_to_num(youden, nan=-np.inf), axis=0)]
+    cuts[np.isnan(youden).all(axis=0)] = np.nan
+    return cuts, higher_better
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from electre_tri import CLASSES, DEFAULT_COLUMNS, electre_tri
+
+def classify_csv_stream(filename, output, thresholds, lmds, weights=None, columns = DEFAULT_COLUMNS,
+            keep_columns=None, filter_rows=None, filter_columns=None, chunksize=2000, sep='\t'):
+    """
+    Pessimistic and optimistic majority sorting of a csv that doesn't fit in memory,
+    e.g. the full openfoodfacts.csv export. The file is read chunksize rows at a time,
+    the classified rows are appended to output, so only one chunk is in memory.
+
+    thresholds - fixed borders (see generate_thresholds), they can't be learned from a stream
+    lmds - list of proportions of weights, one pessimistic and one optimistic column for each
+    keep_columns - other columns of the input to copy to the output
+    filter_rows - function taking a chunk and returning the rows to classify,
+        the rows with missing criteria values are dropped in any case
+    filter_columns - other columns of the input filter_rows needs, they are read but not written,
+        e.g. ['categories'] for lambda chunk: chunk[chunk.categories.str.contains('surgelé', na=False)]
+    sep - the separator of the input, the output is a regular csv
+
+    returns the number of classified rows
+    """
+    keep_columns = list(keep_columns or [])
+    outcols = keep_columns + [column for column in columns if column not in keep_columns]
+    usecols = outcols + [column for column in filter_columns or [] if column not in outcols]
+    labels = np.array(CLASSES)
+
+    # the output is written (header only) before the first chunk, so that it doesn't keep
+    # the rows of a previous run when no row is left after filtering
+    header = outcols + [f'{sort}_electre_lmd={lmd}' for lmd in lmds for sort in ('pessim', 'optim')]
+    pd.DataFrame(columns=header).to_csv(output, index=False)
+
+    n_rows = 0
+    for chunk in pd.read_csv(filename, sep=sep, usecols=usecols, chunksize=chunksize):
+        chunk = chunk.dropna(subset=columns)
+        if filter_rows is not None:
+            chunk = filter_rows(chunk)
+        if len(chunk) == 0:
+            continue
+
+        codes = electre_tri(chunk, lmds, [weights], columns, thresholds=thresholds)
+
+        result = chunk[outcols].copy()
+        for l_idx, lmd in enumerate(lmds):
+            result[f'pessim_electre_lmd={lmd}'] = labels[codes[0, 0, l_idx]]
+            result[f'optim_electre_lmd={lmd}'] = labels[codes[1, 0, l_idx]]
+
+        result.to_csv(output, mode='a', header=False, index=False)
+        n_rows += len(result)
+
+    return n_rows
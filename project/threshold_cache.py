@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from electre_tri import generate_thresholds
+
+def dataset_fingerprint(df, columns, label_col='nutriscore_grade'):
+    """Hash of the criteria columns (names and values) and of the labels,
+    the only inputs the learned thresholds depend on"""
+    data = df[list(columns) + [label_col]]
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps(list(columns)).encode())
+    hasher.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+def cached_thresholds(df, columns, cache_dir='.thresholds_cache', max_entries=32):
+    """
+    Same as generate_thresholds(df, columns), but the result is kept on disk
+    so the borders are learned only once for a dataset.
+
+    cache_dir - the directory to save the thresholds to, one json file per dataset
+    max_entries - the number of datasets to keep, the least recently used ones are removed
+    """
+    key = dataset_fingerprint(df, columns)
+    path = os.path.join(cache_dir, f'{key}.json')
+
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                thresholds = json.load(f)
+            # the modification time marks the last use
+            os.utime(path)
+            return thresholds
+        except (ValueError, OSError):
+            # truncated or corrupt entry (or removed meanwhile), learned and written again
+            pass
+
+    thresholds = generate_thresholds(df, columns)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # a temporary file per writer, several processes can miss the cache of the same dataset at once
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump({key: [float(v) for v in value] for key, value in thresholds.items()}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    evict_thresholds(cache_dir, max_entries)
+    return thresholds
+
+def evict_thresholds(cache_dir, max_entries):
+    """Remove the least recently used thresholds, leaving max_entries of them"""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.json'):
+            path = os.path.join(cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                # removed by another process meanwhile
+                continue
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass